@@ -1,26 +1,162 @@
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
 from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import Query
 from fastapi.responses import HTMLResponse
 from fastapi.responses import JSONResponse
 
+from backend.services.community_services import run_community_drilldown_service
+from backend.services.community_services import run_community_page_service
 from backend.services.community_services import run_community_service
+from backend.services.community_services import stream_community_service
+from backend.services.compare_services import DEFAULT_COMPARE_TIMEOUT
+from backend.services.compare_services import run_compare_service
+from backend.services.window_services import run_window_service
+from backend.tools.admission import admission
+from backend.tools.community_base import detector_options_query
 from backend.tools.custom_enums import CommunityAlgorithm
 from backend.tools.custom_enums import FileSize
+from backend.tools.custom_enums import OutputFormat
+from backend.tools.custom_enums import VizMode
+from backend.tools.graph_cache import csr_cache
+from backend.tools.graph_cache import graph_cache
+from backend.tools.reduction import GraphReduction
+from backend.tools.reduction import reduction_query
+from backend.tools.result_store import result_store
+from backend.tools.streaming import DEFAULT_PAGE_SIZE
+from backend.tools.streaming import json_response
+from backend.tools.streaming import MAX_PAGE_SIZE
 
 
 community_router = APIRouter(prefix="/community", tags=["Community"])
 
 
+@community_router.get("/cache/stats", response_class=JSONResponse, tags=["Community"])
+async def cache_stats():
+    return {
+        "graphs": graph_cache.stats(),
+        "csr_graphs": csr_cache.stats(),
+        "results": result_store.stats(),
+    }
+
+
+@community_router.get(
+    "/admission/stats", response_class=JSONResponse, tags=["Community"]
+)
+async def admission_stats():
+    return admission.stats()
+
+
+@community_router.get("/compare", response_class=JSONResponse, tags=["Community"])
+def compare_communities(
+    file_size: FileSize = FileSize.SMALL_2D,
+    algorithms: Optional[List[CommunityAlgorithm]] = Query(None),
+    timeout: float = Query(DEFAULT_COMPARE_TIMEOUT, gt=0),
+    include_partitions: bool = True,
+    detector_options: Dict[str, Any] = Depends(detector_options_query),
+    reduction: GraphReduction = Depends(reduction_query),
+):
+    return json_response(
+        run_compare_service(
+            file_size=file_size,
+            algorithms=algorithms,
+            timeout=timeout,
+            include_partitions=include_partitions,
+            reduction=reduction,
+            **detector_options,
+        )
+    )
+
+
 @community_router.get("/{algorithm}", response_class=JSONResponse, tags=["Community"])
-async def run_community(
-    algorithm: CommunityAlgorithm, file_size: FileSize = FileSize.SMALL_2D
+def run_community(
+    algorithm: CommunityAlgorithm,
+    file_size: FileSize = FileSize.SMALL_2D,
+    detector_options: Dict[str, Any] = Depends(detector_options_query),
+    reduction: GraphReduction = Depends(reduction_query),
+    output_format: OutputFormat = Query(OutputFormat.JSON, alias="format"),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
 ):
-    return run_community_service(algorithm=algorithm, file_size=file_size)
+    if output_format == OutputFormat.JSON and (cursor or limit):
+        return run_community_page_service(
+            algorithm=algorithm,
+            file_size=file_size,
+            cursor=cursor,
+            limit=limit or DEFAULT_PAGE_SIZE,
+            reduction=reduction,
+            **detector_options,
+        )
+    return stream_community_service(
+        algorithm=algorithm,
+        file_size=file_size,
+        output_format=output_format,
+        reduction=reduction,
+        **detector_options,
+    )
 
 
 @community_router.get(
     "/{algorithm}/viz", response_class=HTMLResponse, tags=["Community"]
 )
-async def viz_community(
-    algorithm: CommunityAlgorithm, file_size: FileSize = FileSize.SMALL_2D
+def viz_community(
+    algorithm: CommunityAlgorithm,
+    file_size: FileSize = FileSize.SMALL_2D,
+    viz_mode: VizMode = VizMode.AUTO,
+    detector_options: Dict[str, Any] = Depends(detector_options_query),
+    reduction: GraphReduction = Depends(reduction_query),
+):
+    return run_community_service(
+        algorithm=algorithm,
+        file_size=file_size,
+        viz=True,
+        viz_mode=viz_mode,
+        reduction=reduction,
+        **detector_options,
+    )
+
+
+@community_router.get(
+    "/{algorithm}/windows", response_class=JSONResponse, tags=["Community"]
+)
+def run_community_windows(
+    algorithm: CommunityAlgorithm,
+    window: float = Query(..., gt=0),
+    step: Optional[float] = Query(None, gt=0),
+    file_size: FileSize = FileSize.SMALL_2D,
+    warm_start: bool = True,
+    include_partitions: bool = False,
+    detector_options: Dict[str, Any] = Depends(detector_options_query),
+):
+    return run_window_service(
+        algorithm=algorithm,
+        file_size=file_size,
+        window=window,
+        step=step,
+        warm_start=warm_start,
+        include_partitions=include_partitions,
+        **detector_options,
+    )
+
+
+@community_router.get(
+    "/{algorithm}/viz/{community_id}", response_class=HTMLResponse, tags=["Community"]
+)
+def viz_community_detail(
+    algorithm: CommunityAlgorithm,
+    community_id: int,
+    file_size: FileSize = FileSize.SMALL_2D,
+    detector_options: Dict[str, Any] = Depends(detector_options_query),
+    reduction: GraphReduction = Depends(reduction_query),
 ):
-    return run_community_service(algorithm=algorithm, file_size=file_size, viz=True)
+    return run_community_drilldown_service(
+        algorithm=algorithm,
+        file_size=file_size,
+        community_id=community_id,
+        reduction=reduction,
+        **detector_options,
+    )
@@ -0,0 +1,35 @@
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import Query
+from fastapi.responses import JSONResponse
+
+from backend.services.evaluation_services import run_evaluation_service
+from backend.tools.community_base import detector_options_query
+from backend.tools.custom_enums import CommunityAlgorithm
+from backend.tools.custom_enums import FileSize
+from backend.tools.reduction import GraphReduction
+from backend.tools.reduction import reduction_query
+
+evaluation_router = APIRouter(prefix="/evaluation", tags=["Evaluation"])
+
+
+@evaluation_router.get("/", response_class=JSONResponse)
+def evaluate_algorithms(
+    file_size: FileSize = FileSize.SMALL_2D,
+    gt_file_size: FileSize = FileSize.TEST,
+    algorithms: Optional[List[CommunityAlgorithm]] = Query(None),
+    detector_options: Dict[str, Any] = Depends(detector_options_query),
+    reduction: GraphReduction = Depends(reduction_query),
+):
+    return run_evaluation_service(
+        file_size=file_size,
+        gt_file_size=gt_file_size,
+        algorithms=algorithms,
+        reduction=reduction,
+        **detector_options,
+    )
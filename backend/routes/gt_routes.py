@@ -1,24 +1,40 @@
+from typing import Optional
+
 from fastapi import APIRouter
+from fastapi import Query
 from fastapi.responses import HTMLResponse
 from fastapi.responses import JSONResponse
 
-from backend.services.gt_services import GroundTruth
+from backend.services.gt_services import get_ground_truth
+from backend.services.gt_services import run_ground_truth_page_service
+from backend.services.gt_services import stream_ground_truth_service
 from backend.services.gt_statistic_services import GroundTruthStatistics
 from backend.tools.custom_enums import FileSize
+from backend.tools.custom_enums import OutputFormat
+from backend.tools.streaming import DEFAULT_PAGE_SIZE
+from backend.tools.streaming import MAX_PAGE_SIZE
 
 gt_router = APIRouter(prefix="/gt", tags=["Ground Truth"])
 
 
 @gt_router.get("/", response_class=JSONResponse)
-async def ground_truth(file_size: FileSize = FileSize.SMALL_2D):
-    gt = GroundTruth(file_size=file_size)
-    return {"node_gt": gt.node_gt, "gt_to_nodes": gt.gt_to_nodes}
+def ground_truth(
+    file_size: FileSize = FileSize.SMALL_2D,
+    output_format: OutputFormat = Query(OutputFormat.JSON, alias="format"),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+):
+    if output_format == OutputFormat.JSON and (cursor or limit):
+        return run_ground_truth_page_service(
+            file_size=file_size, cursor=cursor, limit=limit or DEFAULT_PAGE_SIZE
+        )
+    return stream_ground_truth_service(file_size=file_size, output_format=output_format)
 
 
 @gt_router.get("/stats", response_class=JSONResponse)
-async def ground_truth_statistics(file_size: FileSize = FileSize.SMALL_2D):
-    gt = GroundTruth(file_size=file_size)
-    stats = GroundTruthStatistics(gt.gt_to_nodes)
+def ground_truth_statistics(file_size: FileSize = FileSize.SMALL_2D):
+    gt = get_ground_truth(file_size=file_size)
+    stats = GroundTruthStatistics(gt)
     return {
         "num_groups": stats.num_groups,
         "group_sizes": stats.group_sizes,
@@ -27,8 +43,8 @@ async def ground_truth_statistics(file_size: FileSize = FileSize.SMALL_2D):
 
 
 @gt_router.get("/histogram", response_class=HTMLResponse)
-async def ground_truth_histogram(file_size: FileSize = FileSize.SMALL_2D):
-    gt = GroundTruth(file_size=file_size)
-    stats = GroundTruthStatistics(gt.gt_to_nodes)
+def ground_truth_histogram(file_size: FileSize = FileSize.SMALL_2D):
+    gt = get_ground_truth(file_size=file_size)
+    stats = GroundTruthStatistics(gt)
     fig = stats.plot_group_size_histogram()
     return HTMLResponse(content=fig.to_html(full_html=False), status_code=200)
@@ -0,0 +1,110 @@
+from functools import partial
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import HTTPException
+from fastapi import Query
+from fastapi import status
+from fastapi.responses import HTMLResponse
+from fastapi.responses import JSONResponse
+
+from backend.services.community_services import admit_unless_stored
+from backend.services.community_services import run_community_job
+from backend.services.gt_services import run_ground_truth_service
+from backend.services.job_services import job_manager
+from backend.tools.community_base import CommunityDetectionFactory
+from backend.tools.community_base import detector_options_query
+from backend.tools.custom_enums import CommunityAlgorithm
+from backend.tools.custom_enums import FileSize
+from backend.tools.custom_enums import JobStatus
+from backend.tools.custom_enums import VizMode
+from backend.tools.reduction import GraphReduction
+from backend.tools.reduction import reduction_query
+
+job_router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@job_router.post(
+    "/community/{algorithm}",
+    response_class=JSONResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_community_job(
+    algorithm: CommunityAlgorithm,
+    file_size: FileSize = FileSize.SMALL_2D,
+    viz: bool = False,
+    viz_mode: VizMode = VizMode.AUTO,
+    detector_options: Dict[str, Any] = Depends(detector_options_query),
+    reduction: GraphReduction = Depends(reduction_query),
+    timeout: Optional[float] = Query(None, gt=0),
+):
+    detector = CommunityDetectionFactory.get_community_detector(
+        algorithm, **detector_options
+    )
+    job = job_manager.submit(
+        "community",
+        run_community_job,
+        algorithm=algorithm,
+        file_size=file_size,
+        viz=viz,
+        viz_mode=viz_mode,
+        reduction=reduction,
+        timeout=timeout,
+        admit=partial(admit_unless_stored, algorithm, file_size, detector, reduction),
+        params={
+            "algorithm": algorithm,
+            "file_size": file_size,
+            "viz": viz,
+            "viz_mode": viz_mode,
+            **detector_options,
+            "reduction": reduction.params,
+        },
+        **detector_options,
+    )
+    return job.to_dict()
+
+
+@job_router.post(
+    "/gt", response_class=JSONResponse, status_code=status.HTTP_202_ACCEPTED
+)
+async def submit_ground_truth_job(
+    file_size: FileSize = FileSize.SMALL_2D,
+    timeout: Optional[float] = Query(None, gt=0),
+):
+    job = job_manager.submit(
+        "ground_truth",
+        run_ground_truth_service,
+        file_size=file_size,
+        timeout=timeout,
+        params={"file_size": file_size},
+    )
+    return job.to_dict()
+
+
+@job_router.get("/{job_id}", response_class=JSONResponse)
+async def job_status(job_id: str):
+    return job_manager.get(job_id).to_dict()
+
+
+@job_router.get("/{job_id}/result")
+async def job_result(job_id: str):
+    job = job_manager.get(job_id)
+    if job.status in (JobStatus.PENDING, JobStatus.RUNNING):
+        return JSONResponse(content=job.to_dict(), status_code=status.HTTP_202_ACCEPTED)
+    if job.status != JobStatus.SUCCEEDED:
+        error = job.error or {
+            "status_code": status.HTTP_410_GONE,
+            "detail": f"Job {job.status.value}.",
+        }
+        raise HTTPException(status_code=error["status_code"], detail=error["detail"])
+    if job.params.get("viz"):
+        return HTMLResponse(content=job.result, status_code=200)
+    return job.result
+
+
+@job_router.delete("/{job_id}", response_class=JSONResponse)
+async def cancel_job(job_id: str):
+    return job_manager.cancel(job_id).to_dict()
@@ -0,0 +1,45 @@
+from fastapi import APIRouter
+from fastapi import HTTPException
+from fastapi import status
+from fastapi.responses import PlainTextResponse
+from fastapi.responses import Response
+
+from backend.tools.instrumentation import format_profile
+from backend.tools.instrumentation import profile_store
+from backend.tools.instrumentation import render_metrics
+
+metrics_router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@metrics_router.get("", response_class=PlainTextResponse)
+def metrics():
+    return Response(content=render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@metrics_router.get("/profiles/{profile_id}")
+def profile(profile_id: str, raw: bool = False, sort: str = "cumulative"):
+    dump = profile_store.get(profile_id)
+    if dump is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile not found: {profile_id}",
+        )
+    if raw:
+        # Marshalled pstats data, readable with pstats.Stats(<saved file>).
+        return Response(
+            content=dump,
+            media_type="application/octet-stream",
+            headers={
+                "Content-Disposition": f'attachment; filename="{profile_id}.prof"'
+            },
+        )
+    try:
+        report = format_profile(dump, sort=sort)
+    except KeyError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid sort key: {sort}",
+        ) from exc
+    return PlainTextResponse(report)
@@ -1,15 +1,422 @@
+import os
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Any
+from typing import ContextManager
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import networkx as nx
+from fastapi import HTTPException
+from fastapi import status
+from fastapi.responses import Response
+
+from backend.services.job_services import JobResult
+from backend.tools.admission import admission
+from backend.tools.admission import graph_size
+from backend.tools.admission import graph_size_bound
+from backend.tools.community_base import CommunityDetectionBase
 from backend.tools.community_base import CommunityDetectionFactory
+from backend.tools.community_base import normalize_partition
 from backend.tools.custom_enums import CommunityAlgorithm
 from backend.tools.custom_enums import FileSize
-from backend.tools.path_selecter import path_selecter
+from backend.tools.custom_enums import OutputFormat
+from backend.tools.custom_enums import VizMode
+from backend.tools.graph_cache import graph_cache
+from backend.tools.graph_utils import create_community_graph_visualization
+from backend.tools.graph_utils import create_html_visualization
+from backend.tools.instrumentation import add_response_headers
+from backend.tools.instrumentation import peak_memory
+from backend.tools.instrumentation import set_labels
+from backend.tools.instrumentation import stage
+from backend.tools.reduction import GraphReduction
+from backend.tools.reduction import NO_REDUCTION
+from backend.tools.reduction import reduced_graphs
+from backend.tools.reduction import reduction_stats
+from backend.tools.result_store import dataset_fingerprint
+from backend.tools.result_store import result_store
+from backend.tools.streaming import iter_json_array
+from backend.tools.streaming import iter_json_object
+from backend.tools.streaming import iter_ndjson
+from backend.tools.streaming import json_response
+from backend.tools.streaming import paginate
+from backend.tools.streaming import streaming_response
+
+PAGE_CACHE_SIZE = int(os.environ.get("PARTITION_PAGE_CACHE_SIZE", 4))
+
+Partition = Union[Dict[str, int], List[List[str]]]
+# Nodes and their labels, or the communities and None.
+PagedPartition = Tuple[List, Optional[List[int]]]
+
+
+def result_key(
+    algorithm: CommunityAlgorithm,
+    file_size: FileSize,
+    community_detector: CommunityDetectionBase,
+    reduction: GraphReduction = NO_REDUCTION,
+) -> str:
+    """
+    Key of a detector's stored partition on a possibly reduced dataset.
+    """
+    params = community_detector.params
+    if reduction.active:
+        params = {**params, "reduction": reduction.params}
+    return result_store.make_key(algorithm.value, file_size, params)
+
+
+def admit_detector(
+    algorithm: CommunityAlgorithm,
+    file_size: FileSize,
+    community_detector: CommunityDetectionBase,
+    reduction: GraphReduction = NO_REDUCTION,
+) -> ContextManager[None]:
+    """
+    Wait for admission control to let a detector run on a dataset.
+
+    Raises 413 when the estimated cost can never be admitted and 429 when no
+    slot frees up in time.
+    """
+    num_nodes, num_edges = graph_size(file_size, reduction)
+    return admission.admit(
+        algorithm.value,
+        community_detector.estimate_cost(num_nodes, num_edges),
+        community_detector.max_concurrent,
+    )
+
+
+def admit_unless_stored(
+    algorithm: CommunityAlgorithm,
+    file_size: FileSize,
+    community_detector: CommunityDetectionBase,
+    reduction: GraphReduction = NO_REDUCTION,
+) -> ContextManager[None]:
+    """
+    Admit a run handed to a worker process, without loading its graph here.
+
+    A run whose result is already stored goes through at once, as
+    ``get_partition`` will only read it. A graph of unknown size is estimated
+    from upper bounds of its counts, capped to the admission limits: the run
+    holds its algorithm's slot and reserves up to the whole memory budget
+    rather than being rejected on a guess.
+    """
+    if result_store.contains(
+        result_key(algorithm, file_size, community_detector, reduction)
+    ):
+        return nullcontext()
+    size = graph_size(file_size, reduction, load=False)
+    if size is not None:
+        estimate = community_detector.estimate_cost(*size)
+    else:
+        estimate = admission.cap(
+            community_detector.estimate_cost(*graph_size_bound(file_size))
+        )
+    return admission.admit(algorithm.value, estimate, community_detector.max_concurrent)
+
+
+def _prepare_detector(
+    algorithm: CommunityAlgorithm,
+    file_size: FileSize,
+    reduction: GraphReduction,
+    detector_options: Dict[str, Any],
+) -> Tuple[CommunityDetectionBase, str]:
+    set_labels(algorithm=algorithm.value, dataset=file_size.value)
+    community_detector = CommunityDetectionFactory.get_community_detector(
+        algorithm, **detector_options
+    )
+    if reduction.active:
+        reduction_stats(file_size, reduction)
+    return community_detector, result_key(
+        algorithm, file_size, community_detector, reduction
+    )
+
+
+def _load_partition(
+    algorithm: CommunityAlgorithm,
+    file_size: FileSize,
+    reduction: GraphReduction,
+    community_detector: CommunityDetectionBase,
+    key: str,
+) -> Partition:
+    """
+    Read a stored partition or run the detector under admission control.
+
+    A fresh run reports the detector's scalar stats, such as the Girvan-Newman
+    ``stop_reason`` and its peak memory, as ``X-Detector-*`` response headers.
+    """
+    partition = result_store.get(key)
+    if partition is None:
+        with admit_detector(algorithm, file_size, community_detector, reduction):
+            with peak_memory() as memory:
+                partition = normalize_partition(
+                    community_detector.run(file_size, reduction)
+                )
+        community_detector.stats["peak_memory_bytes"] = memory["peak_bytes"]
+        add_response_headers(
+            {
+                f"X-Detector-{name.replace('_', '-').title()}": str(value)
+                for name, value in community_detector.stats.items()
+                if isinstance(value, (int, float, str))
+            }
+        )
+        if community_detector.cacheable:
+            result_store.put(key, partition)
+    return partition
+
+
+def get_partition(
+    algorithm: CommunityAlgorithm,
+    file_size: FileSize,
+    reduction: GraphReduction = NO_REDUCTION,
+    **detector_options,
+) -> Tuple[str, Partition]:
+    """
+    Return the result key and partition of a detector, reusing a stored result.
+
+    Keyword arguments are detector options such as ``seed`` or ``n_clusters``
+    and are forwarded to the factory. An active ``reduction`` becomes part of
+    the result key and its node and edge counts are reported in the response.
+    Only runs that miss the result store go through admission control, and
+    only results the detector reports as cacheable are stored.
+    """
+    community_detector, key = _prepare_detector(
+        algorithm, file_size, reduction, detector_options
+    )
+    return key, _load_partition(
+        algorithm, file_size, reduction, community_detector, key
+    )
+
+
+class _PartitionPages:
+    """
+    Small LRU of decoded partitions served page by page, keyed by result key.
+
+    A node -> community mapping is kept as parallel node and label lists, so
+    every page is a slice instead of a new read and decode of the stored JSON.
+    """
+
+    def __init__(self, max_entries: int = PAGE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, PagedPartition]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[PagedPartition]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    @staticmethod
+    def split(partition: Partition) -> PagedPartition:
+        if isinstance(partition, dict):
+            return list(partition), list(partition.values())
+        return partition, None
+
+    def put(self, key: str, partition: Partition) -> PagedPartition:
+        entry = self.split(partition)
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+
+partition_pages = _PartitionPages()
+
+
+def get_graph(
+    file_size: FileSize, reduction: GraphReduction = NO_REDUCTION
+) -> nx.Graph:
+    """
+    Return the NetworkX graph of a dataset, reduced if requested.
+    """
+    if reduction.active:
+        return reduced_graphs.get(file_size, reduction)[0].to_networkx()
+    return graph_cache.get(file_size)
+
+
+@stage("community_service")
+def _run_community(
+    algorithm: CommunityAlgorithm,
+    file_size: FileSize,
+    viz: bool,
+    viz_mode: VizMode,
+    reduction: GraphReduction,
+    detector_options: Dict[str, Any],
+) -> Tuple[Any, CommunityDetectionBase]:
+    community_detector, key = _prepare_detector(
+        algorithm, file_size, reduction, detector_options
+    )
+    partition = _load_partition(
+        algorithm, file_size, reduction, community_detector, key
+    )
+
+    if not viz:
+        return partition, community_detector
+    if viz_mode == VizMode.AUTO:
+        viz_mode = VizMode.COMMUNITIES if file_size == FileSize.LARGE else VizMode.FULL
+    G = get_graph(file_size, reduction)
+    if viz_mode == VizMode.COMMUNITIES:
+        html = create_community_graph_visualization(
+            G, partition, title=f"{algorithm.value} communities", layout_key=key
+        )
+        return html, community_detector
+    layout_key = dataset_fingerprint(file_size)
+    if reduction.active:
+        layout_key = (layout_key, tuple(sorted(reduction.params.items())))
+    html = create_html_visualization(G, partition, layout_key=layout_key)
+    return html, community_detector
 
 
 def run_community_service(
-    algorithm: CommunityAlgorithm, file_size: FileSize, viz: bool = False
+    algorithm: CommunityAlgorithm,
+    file_size: FileSize,
+    viz: bool = False,
+    viz_mode: VizMode = VizMode.AUTO,
+    reduction: GraphReduction = NO_REDUCTION,
+    **detector_options,
 ):
-    path = path_selecter(file_size=file_size)
-    community_detector = CommunityDetectionFactory.get_community_detector(algorithm)
+    return _run_community(
+        algorithm, file_size, viz, viz_mode, reduction, detector_options
+    )[0]
 
-    if not viz:
-        return community_detector.run(path)
-    return community_detector.run_viz(path)
+
+def run_community_job(
+    algorithm: CommunityAlgorithm,
+    file_size: FileSize,
+    viz: bool = False,
+    viz_mode: VizMode = VizMode.AUTO,
+    reduction: GraphReduction = NO_REDUCTION,
+    **detector_options,
+) -> JobResult:
+    """
+    Job entry point around ``run_community_service`` that reports with the job
+    what a worker cannot send as headers: the detector's stats, such as its
+    peak memory (empty when the result was already stored), and the counts of
+    an active reduction.
+    """
+    result, community_detector = _run_community(
+        algorithm, file_size, viz, viz_mode, reduction, detector_options
+    )
+    info: Dict[str, Any] = {"detector": community_detector.stats}
+    if reduction.active:
+        info["reduction"] = reduction_stats(file_size, reduction)
+    return JobResult(result, info)
+
+
+@stage("community_service")
+def run_community_page_service(
+    algorithm: CommunityAlgorithm,
+    file_size: FileSize,
+    cursor: Optional[str],
+    limit: int,
+    reduction: GraphReduction = NO_REDUCTION,
+    **detector_options,
+) -> Dict[str, Any]:
+    """
+    Return one page of a partition and the cursor of the next page.
+
+    Node -> community mappings are paged over nodes, lists of communities over
+    communities, both in the order of the stored result. The decoded result is
+    kept in ``partition_pages``, so following pages are slices of it. The
+    counts of an active reduction are returned with every page.
+    """
+    community_detector, key = _prepare_detector(
+        algorithm, file_size, reduction, detector_options
+    )
+    entry = partition_pages.get(key)
+    if entry is None:
+        partition = _load_partition(
+            algorithm, file_size, reduction, community_detector, key
+        )
+        if community_detector.cacheable:
+            entry = partition_pages.put(key, partition)
+        else:
+            entry = _PartitionPages.split(partition)
+    items, labels = entry
+    start, end, next_cursor = paginate(len(items), cursor, limit)
+    if labels is None:
+        page: Partition = items[start:end]
+    else:
+        page = dict(zip(items[start:end], labels[start:end]))
+    return {
+        "partition": page,
+        "total": len(items),
+        "next_cursor": next_cursor,
+        "reduction": reduction_stats(file_size, reduction)
+        if reduction.active
+        else None,
+    }
+
+
+@stage("community_service")
+def stream_community_service(
+    algorithm: CommunityAlgorithm,
+    file_size: FileSize,
+    output_format: OutputFormat,
+    reduction: GraphReduction = NO_REDUCTION,
+    **detector_options,
+) -> Response:
+    """
+    Serialize a partition in the requested output format.
+
+    ``json`` and ``json-stream`` return the same body as
+    ``run_community_service``, the latter in chunks. ``ndjson`` sends one
+    ``{"node", "community"}`` record per node, or one ``{"community", "nodes"}``
+    record per community for list partitions.
+    """
+    _, partition = get_partition(algorithm, file_size, reduction, **detector_options)
+    if output_format == OutputFormat.JSON:
+        return json_response(partition)
+    if output_format == OutputFormat.NDJSON:
+        if isinstance(partition, dict):
+            records = (
+                {"node": node, "community": label} for node, label in partition.items()
+            )
+        else:
+            records = (
+                {"community": label, "nodes": nodes}
+                for label, nodes in enumerate(partition)
+            )
+        return streaming_response(iter_ndjson(records), output_format)
+    if isinstance(partition, dict):
+        return streaming_response(iter_json_object(partition.items()), output_format)
+    return streaming_response(iter_json_array(partition), output_format)
+
+
+@stage("community_service")
+def run_community_drilldown_service(
+    algorithm: CommunityAlgorithm,
+    file_size: FileSize,
+    community_id: int,
+    reduction: GraphReduction = NO_REDUCTION,
+    **detector_options,
+) -> str:
+    """
+    Render the induced subgraph of a single detected community.
+    """
+    key, partition = get_partition(algorithm, file_size, reduction, **detector_options)
+    if isinstance(partition, dict):
+        members = [node for node, label in partition.items() if label == community_id]
+    elif 0 <= community_id < len(partition):
+        members = partition[community_id]
+    else:
+        members = []
+    if not members:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Community {community_id} not found for {algorithm.value}.",
+        )
+
+    subgraph = get_graph(file_size, reduction).subgraph(members)
+    sub_partition = {node: community_id for node in members}
+    return create_html_visualization(
+        subgraph,
+        sub_partition,
+        title=f"{algorithm.value} community {community_id}",
+        layout_key=(key, community_id),
+    )
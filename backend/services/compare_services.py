@@ -0,0 +1,182 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import numpy as np
+from fastapi import HTTPException
+
+from backend.services.community_services import admit_detector
+from backend.services.community_services import result_key
+from backend.services.job_services import run_in_process
+from backend.tools.community_base import CommunityDetectionFactory
+from backend.tools.community_base import normalize_partition
+from backend.tools.csr_communities import modularity_csr
+from backend.tools.custom_enums import CommunityAlgorithm
+from backend.tools.custom_enums import FileSize
+from backend.tools.custom_enums import JobStatus
+from backend.tools.graph_cache import csr_cache
+from backend.tools.graph_snapshot import CSRGraph
+from backend.tools.graph_utils import node_label_array
+from backend.tools.instrumentation import peak_memory
+from backend.tools.instrumentation import set_labels
+from backend.tools.instrumentation import stage
+from backend.tools.reduction import GraphReduction
+from backend.tools.reduction import NO_REDUCTION
+from backend.tools.reduction import reduced_graphs
+from backend.tools.reduction import reduction_stats
+from backend.tools.result_store import result_store
+from backend.tools.shared_graph import attach_csr
+from backend.tools.shared_graph import SharedCSRGraph
+from backend.tools.shared_graph import SharedHandle
+
+COMPARE_MAX_WORKERS = int(os.environ.get("COMPARE_MAX_WORKERS", os.cpu_count() or 1))
+DEFAULT_COMPARE_TIMEOUT = float(os.environ.get("COMPARE_TIMEOUT_SECONDS", 300))
+
+
+def _compact_labels(labels: np.ndarray) -> np.ndarray:
+    """
+    Renumber labels from zero and give unassigned nodes singleton communities.
+    """
+    missing = labels < 0
+    labels = labels.copy()
+    labels[missing] = labels.max(initial=-1) + 1 + np.arange(np.count_nonzero(missing))
+    return np.unique(labels, return_inverse=True)[1]
+
+
+def _detect(csr: CSRGraph, algorithm: CommunityAlgorithm, options: Dict) -> Dict:
+    detector = CommunityDetectionFactory.get_community_detector(algorithm, **options)
+    start = time.perf_counter()
+    with peak_memory() as memory:
+        partition = detector.detect_csr(csr)
+    runtime = time.perf_counter() - start
+    detector.stats["peak_memory_bytes"] = memory["peak_bytes"]
+    labels = _compact_labels(node_label_array(csr.node_labels(), partition))
+    return {
+        "runtime_seconds": runtime,
+        "num_communities": int(labels.max(initial=-1) + 1),
+        "modularity": modularity_csr(csr.adjacency(), labels),
+        "stats": detector.stats,
+        "partition": normalize_partition(partition),
+        "cacheable": detector.cacheable,
+    }
+
+
+def _detect_shared(
+    handle: SharedHandle, algorithm: CommunityAlgorithm, options: Dict
+) -> Dict:
+    """
+    Worker entry point: run one detector on the published graph.
+    """
+    with attach_csr(handle) as csr:
+        result = _detect(csr, algorithm, options)
+        del csr
+    return result
+
+
+def _run_one(
+    handle: SharedHandle,
+    algorithm: CommunityAlgorithm,
+    file_size: FileSize,
+    reduction: GraphReduction,
+    timeout: float,
+    detector_options: Dict,
+) -> Dict[str, Any]:
+    entry: Dict[str, Any] = {"algorithm": algorithm.value}
+    detector = CommunityDetectionFactory.get_community_detector(
+        algorithm, **detector_options
+    )
+    start = time.perf_counter()
+    try:
+        with admit_detector(algorithm, file_size, detector, reduction):
+            outcome, payload = run_in_process(
+                _detect_shared, (handle, algorithm, detector_options), timeout=timeout
+            )
+    except HTTPException as exc:
+        entry["status"] = JobStatus.REJECTED.value
+        entry["runtime_seconds"] = time.perf_counter() - start
+        entry["error"] = exc.detail
+        return entry
+    entry["status"] = outcome.value
+    if outcome != JobStatus.SUCCEEDED:
+        entry["runtime_seconds"] = time.perf_counter() - start
+        entry["error"] = payload["detail"]
+        return entry
+    entry.update(payload)
+    return entry
+
+
+@stage("compare_service")
+def run_compare_service(
+    file_size: FileSize,
+    algorithms: Optional[List[CommunityAlgorithm]] = None,
+    timeout: float = DEFAULT_COMPARE_TIMEOUT,
+    include_partitions: bool = True,
+    reduction: GraphReduction = NO_REDUCTION,
+    **detector_options,
+) -> Dict[str, Any]:
+    """
+    Run several detectors side by side on one parsed graph.
+
+    The dataset is loaded once as CSR arrays and published in shared memory;
+    every detector then runs in its own worker process that maps those arrays,
+    at most ``COMPARE_MAX_WORKERS`` at a time. Each worker is killed once it
+    exceeds ``timeout`` seconds, so a slow detector only loses its own result.
+    Successful partitions are also stored in the result cache, unless the
+    detector reports them as not cacheable. An active
+    ``reduction`` is applied once before the graph is published. Detectors go
+    through admission control in this process; rejected ones are reported
+    with a ``rejected`` status.
+    """
+    set_labels(algorithm="compare", dataset=file_size.value)
+    algorithms = algorithms or list(CommunityAlgorithm)
+    stats = None
+    if reduction.active:
+        stats = reduction_stats(file_size, reduction)
+        csr, _ = reduced_graphs.get(file_size, reduction)
+    else:
+        csr = csr_cache.get(file_size)
+
+    with stage("publish", nodes=csr.num_nodes):
+        shared = SharedCSRGraph(csr)
+    with shared, ThreadPoolExecutor(
+        max_workers=max(1, min(COMPARE_MAX_WORKERS, len(algorithms)))
+    ) as pool, stage("compare", algorithms=len(algorithms)):
+        results = list(
+            pool.map(
+                lambda algorithm: _run_one(
+                    shared.handle,
+                    algorithm,
+                    file_size,
+                    reduction,
+                    timeout,
+                    detector_options,
+                ),
+                algorithms,
+            )
+        )
+
+    for algorithm, entry in zip(algorithms, results):
+        if "partition" not in entry:
+            continue
+        if entry.pop("cacheable"):
+            detector = CommunityDetectionFactory.get_community_detector(
+                algorithm, **detector_options
+            )
+            result_store.put(
+                result_key(algorithm, file_size, detector, reduction),
+                entry["partition"],
+            )
+        if not include_partitions:
+            del entry["partition"]
+
+    return {
+        "file_size": file_size.value,
+        "num_nodes": csr.num_nodes,
+        "reduction": stats,
+        "timeout": timeout,
+        "results": results,
+    }
@@ -0,0 +1,81 @@
+import time
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import numpy as np
+from fastapi import HTTPException
+
+from backend.services.community_services import admit_detector
+from backend.services.community_services import get_graph
+from backend.services.gt_services import get_ground_truth
+from backend.tools.community_base import CommunityDetectionFactory
+from backend.tools.custom_enums import CommunityAlgorithm
+from backend.tools.custom_enums import FileSize
+from backend.tools.graph_utils import node_label_array
+from backend.tools.instrumentation import peak_memory
+from backend.tools.partition_metrics import partition_scores
+from backend.tools.reduction import GraphReduction
+from backend.tools.reduction import NO_REDUCTION
+from backend.tools.reduction import reduction_stats
+
+
+def run_evaluation_service(
+    file_size: FileSize,
+    gt_file_size: FileSize = FileSize.TEST,
+    algorithms: Optional[List[CommunityAlgorithm]] = None,
+    reduction: GraphReduction = NO_REDUCTION,
+    **detector_options,
+) -> Dict[str, Any]:
+    """
+    Score detectors against the ground truth on one parsed graph.
+
+    Every detector runs on the same cached graph; partitions and ground truth
+    are aligned through integer node indices before scoring.
+    """
+    stats = reduction_stats(file_size, reduction) if reduction.active else None
+    G = get_graph(file_size, reduction)
+    nodes = list(G.nodes())
+    gt = get_ground_truth(file_size=gt_file_size)
+    truth = gt.labels_for(nodes)
+
+    results = []
+    for algorithm in algorithms or list(CommunityAlgorithm):
+        community_detector = CommunityDetectionFactory.get_community_detector(
+            algorithm, **detector_options
+        )
+        entry: Dict[str, Any] = {"algorithm": algorithm.value}
+        start = time.perf_counter()
+        try:
+            with admit_detector(algorithm, file_size, community_detector, reduction):
+                with peak_memory() as memory:
+                    partition = community_detector.detect_communities(G)
+        except HTTPException as exc:
+            entry["runtime_seconds"] = time.perf_counter() - start
+            entry["status_code"] = exc.status_code
+            entry["error"] = exc.detail
+            results.append(entry)
+            continue
+        except Exception as exc:  # pylint: disable=broad-except
+            entry["runtime_seconds"] = time.perf_counter() - start
+            entry["error"] = f"{type(exc).__name__}: {exc}"
+            results.append(entry)
+            continue
+        entry["runtime_seconds"] = time.perf_counter() - start
+        community_detector.stats["peak_memory_bytes"] = memory["peak_bytes"]
+        entry["stats"] = community_detector.stats
+        predicted = node_label_array(nodes, partition)
+        entry["num_communities"] = int(np.unique(predicted[predicted >= 0]).size)
+        entry.update(partition_scores(predicted, truth))
+        results.append(entry)
+
+    return {
+        "file_size": file_size.value,
+        "ground_truth": gt_file_size.value,
+        "num_nodes": len(nodes),
+        "reduction": stats,
+        "num_ground_truth_nodes": len(gt.node_ids),
+        "num_matched_nodes": int(np.count_nonzero(truth >= 0)),
+        "results": results,
+    }
@@ -1,37 +1,78 @@
 import gzip
-from collections import defaultdict
+import os
+import threading
+from collections import Counter
+from itertools import chain
+from typing import Any
 from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
 from typing import Set
+from typing import Tuple
 
+import numpy as np
 from fastapi import HTTPException
 from fastapi import status
+from fastapi.responses import Response
 
 from backend.tools.custom_enums import FileSize
+from backend.tools.custom_enums import OutputFormat
+from backend.tools.instrumentation import set_labels
+from backend.tools.instrumentation import stage
 from backend.tools.path_selecter import path_selecter
+from backend.tools.streaming import iter_json_object
+from backend.tools.streaming import iter_ndjson
+from backend.tools.streaming import json_response
+from backend.tools.streaming import paginate
+from backend.tools.streaming import streaming_response
 
 
 class GroundTruth:
     """
     Represents ground truth data, providing mappings between nodes and groups.
 
+    Node IDs are interned once and the data is held in arrays: an int32 group
+    label per node and a CSR-style membership list per group. Group IDs are
+    numbered from 1 in file order; a node listed in several groups is labelled
+    with the last one.
+
     Attributes:
-        node_gt (Dict[str, int]): Mapping from node ID to group ID.
-        gt_to_nodes (Dict[int, Set[str]]): Mapping from group ID to set of node IDs.
+        node_ids (List[str]): Interned node IDs, indexed by node.
+        labels (np.ndarray): Group ID of each node.
+        group_offsets (np.ndarray): Start of each group's member slice (length G + 1).
+        group_members (np.ndarray): Concatenated node indices of every group.
+        group_sizes (Dict[int, int]): Mapping from group ID to the size of the group.
+        histogram (Counter): Histogram of group sizes.
         file_size (FileSize): The size category of the file to be processed.
     """
 
     def __init__(self, file_size: FileSize):
-        self.node_gt: Dict[str, int] = {}
-        self.gt_to_nodes: Dict[int, Set[str]] = defaultdict(set)
         self.file_size: FileSize = file_size
+        self.node_ids: List[str] = []
+        self.labels: np.ndarray = np.empty(0, dtype=np.int32)
+        self.group_offsets: np.ndarray = np.zeros(1, dtype=np.int64)
+        self.group_members: np.ndarray = np.empty(0, dtype=np.int32)
+        self.group_sizes: Dict[int, int] = {}
+        self.histogram: Counter = Counter()
+        self._node_index: Dict[str, int] = {}
+        self._node_gt: Optional[Dict[str, int]] = None
+        self._gt_to_nodes: Optional[Dict[int, Set[str]]] = None
         self._load_data()
 
     def _load_data(self) -> None:
         """
-        Loads ground truth data from a file into node_gt and gt_to_nodes mappings.
+        Loads ground truth data from a file into the node and group arrays.
         """
+        with stage("load_ground_truth") as info:
+            self._read_groups()
+            info.update(nodes=len(self.node_ids), groups=self.num_groups)
+
+    def _read_groups(self) -> None:
         gt_file = path_selecter(file_size=self.file_size)
-        group_id = 0
+        index = self._node_index
+        members: List[int] = []
+        offsets: List[int] = [0]
 
         open_func = gzip.open if gt_file.endswith(".gz") else open
 
@@ -41,20 +82,21 @@ class GroundTruth:
                     line = line.strip()
                     if not line or line.startswith("#"):
                         continue
-                    group_id += 1
                     parts = line.split(",")
                     if not parts:
                         raise ValueError(f"Invalid data format in line {line_number}.")
+                    group: Dict[int, None] = {}
                     for node_id in parts:
                         node_id = node_id.strip()
                         if not node_id:
                             raise ValueError(
                                 f"Empty node ID found in line {line_number}."
                             )
-                        self.node_gt[node_id] = group_id
-                        self.gt_to_nodes[group_id].add(node_id)
+                        group[index.setdefault(node_id, len(index))] = None
+                    members.extend(group)
+                    offsets.append(len(members))
 
-            if not self.node_gt:
+            if not index:
                 raise ValueError("No ground truth data found in the file.")
 
         except FileNotFoundError as exc:
@@ -72,3 +114,168 @@ class GroundTruth:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"An error occurred while loading ground truth data: {str(exc)}",
             ) from exc
+
+        self.node_ids = list(index)
+        self.group_offsets = np.array(offsets, dtype=np.int64)
+        self.group_members = np.array(members, dtype=np.int32)
+        sizes = np.diff(self.group_offsets)
+        # Groups are numbered in file order, so the last group of a node is
+        # the largest ID it appears under.
+        self.labels = np.zeros(len(self.node_ids), dtype=np.int32)
+        np.maximum.at(
+            self.labels,
+            self.group_members,
+            np.repeat(np.arange(1, len(sizes) + 1, dtype=np.int32), sizes),
+        )
+        self.group_sizes = dict(enumerate(sizes.tolist(), 1))
+        values, counts = np.unique(sizes, return_counts=True)
+        self.histogram = Counter(dict(zip(values.tolist(), counts.tolist())))
+
+    @property
+    def num_groups(self) -> int:
+        return len(self.group_offsets) - 1
+
+    def group_of(self, node_id: str) -> Optional[int]:
+        """
+        Return the group ID of a node, or None if it has no ground truth.
+        """
+        idx = self._node_index.get(node_id)
+        return None if idx is None else int(self.labels[idx])
+
+    def members(self, group_id: int) -> List[str]:
+        """
+        Return the node IDs of a group.
+        """
+        if not 1 <= group_id <= self.num_groups:
+            return []
+        start, end = self.group_offsets[group_id - 1], self.group_offsets[group_id]
+        return [self.node_ids[idx] for idx in self.group_members[start:end].tolist()]
+
+    def labels_for(self, node_ids: Iterable[str]) -> np.ndarray:
+        """
+        Return the group IDs of the given nodes, with -1 for unknown nodes.
+        """
+        indices = np.array(
+            [self._node_index.get(node_id, -1) for node_id in node_ids],
+            dtype=np.int64,
+        )
+        result = np.full(len(indices), -1, dtype=np.int64)
+        known = indices >= 0
+        result[known] = self.labels[indices[known]]
+        return result
+
+    @property
+    def node_gt(self) -> Dict[str, int]:
+        """
+        Mapping from node ID to group ID, built on first access.
+        """
+        if self._node_gt is None:
+            self._node_gt = dict(zip(self.node_ids, self.labels.tolist()))
+        return self._node_gt
+
+    @property
+    def gt_to_nodes(self) -> Dict[int, Set[str]]:
+        """
+        Mapping from group ID to set of node IDs, built on first access.
+        """
+        if self._gt_to_nodes is None:
+            self._gt_to_nodes = {
+                group_id: set(self.members(group_id))
+                for group_id in range(1, self.num_groups + 1)
+            }
+        return self._gt_to_nodes
+
+
+_ground_truths: Dict[FileSize, Tuple[float, GroundTruth]] = {}
+_ground_truth_lock = threading.Lock()
+
+
+def get_ground_truth(file_size: FileSize) -> GroundTruth:
+    """
+    Return the ground truth of a dataset, loading it once per file version.
+    """
+    set_labels(dataset=file_size.value)
+    gt_file = path_selecter(file_size=file_size)
+    try:
+        mtime = os.path.getmtime(gt_file)
+    except OSError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Ground truth file not found: {gt_file}",
+        ) from exc
+
+    with _ground_truth_lock:
+        cached = _ground_truths.get(file_size)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        gt = GroundTruth(file_size=file_size)
+        _ground_truths[file_size] = (mtime, gt)
+        return gt
+
+
+def run_ground_truth_service(file_size: FileSize) -> Dict[str, Dict]:
+    """
+    Load the ground truth of a dataset and return both of its mappings.
+    """
+    gt = get_ground_truth(file_size=file_size)
+    return {"node_gt": gt.node_gt, "gt_to_nodes": gt.gt_to_nodes}
+
+
+@stage("ground_truth_service")
+def run_ground_truth_page_service(
+    file_size: FileSize, cursor: Optional[str], limit: int
+) -> Dict[str, Any]:
+    """
+    Return one page of ground-truth groups and the labels of their members.
+
+    Pages are taken over groups in file order; ``next_cursor`` is None on the
+    last page.
+    """
+    gt = get_ground_truth(file_size=file_size)
+    start, end, next_cursor = paginate(gt.num_groups, cursor, limit)
+    gt_to_nodes = {
+        group_id: gt.members(group_id) for group_id in range(start + 1, end + 1)
+    }
+    node_gt = {
+        node_id: gt.group_of(node_id)
+        for members in gt_to_nodes.values()
+        for node_id in members
+    }
+    return {
+        "node_gt": node_gt,
+        "gt_to_nodes": gt_to_nodes,
+        "num_groups": gt.num_groups,
+        "next_cursor": next_cursor,
+    }
+
+
+@stage("ground_truth_service")
+def stream_ground_truth_service(
+    file_size: FileSize, output_format: OutputFormat
+) -> Response:
+    """
+    Serialize the ground truth of a dataset in the requested output format.
+
+    ``json`` returns the same body as ``run_ground_truth_service``;
+    ``json-stream`` sends that body in chunks and ``ndjson`` sends one
+    ``{"group", "nodes"}`` record per group.
+    """
+    gt = get_ground_truth(file_size=file_size)
+    group_ids = range(1, gt.num_groups + 1)
+    if output_format == OutputFormat.JSON:
+        return json_response(run_ground_truth_service(file_size=file_size))
+    if output_format == OutputFormat.NDJSON:
+        chunks = iter_ndjson(
+            {"group": group_id, "nodes": gt.members(group_id)} for group_id in group_ids
+        )
+    else:
+        chunks = chain(
+            [b'{"node_gt":'],
+            iter_json_object(zip(gt.node_ids, gt.labels.tolist())),
+            [b',"gt_to_nodes":'],
+            iter_json_object(
+                (group_id, gt.members(group_id)) for group_id in group_ids
+            ),
+            [b"}"],
+        )
+    return streaming_response(chunks, output_format)
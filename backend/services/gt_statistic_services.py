@@ -1,11 +1,15 @@
 from collections import Counter
 from typing import Dict
-from typing import Set
+from typing import TYPE_CHECKING
 
-import plotly.graph_objects as go
 from fastapi import HTTPException
 from fastapi import status
 
+from backend.services.gt_services import GroundTruth
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
 
 class GroundTruthStatistics:
     """
@@ -17,68 +21,27 @@ class GroundTruthStatistics:
         histogram (Counter): Histogram of group sizes.
     """
 
-    def __init__(self, gt_to_nodes: Dict[int, Set[str]]):
-        if not isinstance(gt_to_nodes, dict):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="gt_to_nodes must be a dictionary with group IDs as keys.",
-            )
-        if not all(isinstance(group_id, int) for group_id in gt_to_nodes.keys()):
+    def __init__(self, gt: GroundTruth):
+        if not isinstance(gt, GroundTruth):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="All group IDs in gt_to_nodes must be integers.",
+                detail="gt must be a loaded GroundTruth.",
             )
-        if not all(isinstance(nodes, set) for nodes in gt_to_nodes.values()):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="All values in gt_to_nodes must be sets of node IDs.",
-            )
-        if not all(
-            all(isinstance(node_id, str) for node_id in nodes)
-            for nodes in gt_to_nodes.values()
-        ):
+
+        # Sizes and histogram are precomputed when the ground truth is loaded,
+        # so building statistics does no per-node work.
+        self.num_groups: int = gt.num_groups
+        self.group_sizes: Dict[int, int] = gt.group_sizes
+        self.histogram: Counter = gt.histogram
+        if not self.group_sizes:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="All node IDs in the sets must be strings.",
+                detail="No group sizes to compute; group_sizes is empty.",
             )
 
-        self.num_groups: int = 0
-        self.group_sizes: Dict[int, int] = {}
-        self.histogram: Counter = Counter()
-        self._compute_statistics(gt_to_nodes)
-
-    def _compute_statistics(self, gt_to_nodes: Dict[int, Set[str]]) -> None:
-        """
-        Computes statistics from gt_to_nodes mapping.
-        """
-        try:
-            self.num_groups = len(gt_to_nodes)
-            self.group_sizes = {
-                group_id: len(nodes) for group_id, nodes in gt_to_nodes.items()
-            }
-            if not self.group_sizes:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="No group sizes to compute; group_sizes is empty.",
-                )
-            self.histogram = Counter(self.group_sizes.values())
-            if not self.histogram:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Failed to compute histogram; it is empty.",
-                )
-        except HTTPException:
-            # Re-raise HTTPExceptions to be handled by FastAPI
-            raise
-        except Exception as exc:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error computing statistics: {str(exc)}",
-            ) from exc
-
     def plot_group_size_histogram(
         self, title: str = "Histogram of Group Sizes"
-    ) -> go.Figure:
+    ) -> "go.Figure":
         """
         Creates a histogram visualization of group sizes.
 
@@ -88,6 +51,8 @@ class GroundTruthStatistics:
         Returns:
             go.Figure: A Plotly figure object representing the histogram.
         """
+        import plotly.graph_objects as go
+
         if not self.histogram:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
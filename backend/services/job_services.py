@@ -0,0 +1,348 @@
+import atexit
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Any
+from typing import Callable
+from typing import ContextManager
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+from fastapi import HTTPException
+from fastapi import status
+
+from backend.tools.custom_enums import JobStatus
+
+DEFAULT_MAX_WORKERS = int(
+    os.environ.get("JOB_MAX_WORKERS", max(1, (os.cpu_count() or 2) // 2))
+)
+DEFAULT_TIMEOUT = float(os.environ.get("JOB_TIMEOUT_SECONDS", 600))
+MAX_PENDING_JOBS = int(os.environ.get("JOB_MAX_PENDING", 64))
+MAX_FINISHED_JOBS = 256
+
+# Workers are started with "spawn" so they never inherit locks held by the
+# server's threads at fork time.
+_mp_context = multiprocessing.get_context(os.environ.get("JOB_START_METHOD", "spawn"))
+
+_FINISHED = (
+    JobStatus.SUCCEEDED,
+    JobStatus.FAILED,
+    JobStatus.CANCELLED,
+    JobStatus.TIMED_OUT,
+    JobStatus.REJECTED,
+)
+
+
+def _job_entrypoint(conn, func: Callable, args: Tuple, kwargs: Dict) -> None:
+    """
+    Run a job in the worker process and send its outcome back to the parent.
+    """
+    try:
+        conn.send((True, func(*args, **kwargs)))
+    except HTTPException as exc:
+        conn.send((False, {"status_code": exc.status_code, "detail": exc.detail}))
+    except Exception as exc:  # pylint: disable=broad-except
+        conn.send(
+            (
+                False,
+                {
+                    "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    "detail": f"{type(exc).__name__}: {exc}",
+                },
+            )
+        )
+    finally:
+        conn.close()
+
+
+def run_in_process(
+    func: Callable,
+    args: Tuple = (),
+    kwargs: Optional[Dict] = None,
+    timeout: Optional[float] = None,
+    on_start: Optional[Callable[[Any], None]] = None,
+) -> Tuple[JobStatus, Any]:
+    """
+    Run a picklable callable in a fresh worker process.
+
+    The process is terminated if it exceeds the timeout. Returns the final
+    status together with the result or an error payload.
+    """
+    recv_conn, send_conn = _mp_context.Pipe(duplex=False)
+    process = _mp_context.Process(
+        target=_job_entrypoint, args=(send_conn, func, args, kwargs or {})
+    )
+    process.start()
+    send_conn.close()
+    if on_start is not None:
+        on_start(process)
+    try:
+        if not recv_conn.poll(timeout):
+            process.terminate()
+            return JobStatus.TIMED_OUT, {
+                "status_code": status.HTTP_504_GATEWAY_TIMEOUT,
+                "detail": f"Job exceeded its timeout of {timeout} seconds.",
+            }
+        try:
+            ok, payload = recv_conn.recv()
+        except EOFError:
+            # The worker died without reporting: killed, crashed or failed to
+            # start. Its exit code is only known once it has been joined.
+            process.join(timeout=5)
+            return JobStatus.FAILED, {
+                "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "detail": f"Job worker exited with code {process.exitcode}.",
+            }
+        return (JobStatus.SUCCEEDED if ok else JobStatus.FAILED), payload
+    finally:
+        recv_conn.close()
+        process.join(timeout=5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+
+class JobResult(NamedTuple):
+    """
+    Return value of a job that also reports details about its run, such as
+    counts a worker process cannot send as response headers.
+
+    Attributes:
+        value (Any): Result served by the job's result endpoint.
+        info (Dict[str, Any]): Details reported with the job's status.
+    """
+
+    value: Any
+    info: Dict[str, Any]
+
+
+class Job:
+    """
+    A unit of background work and its outcome.
+
+    Attributes:
+        job_id (str): Unique identifier returned to clients.
+        kind (str): Short description of the work, e.g. "community".
+        status (JobStatus): Current lifecycle state.
+        timeout (float): Maximum run time in seconds once started.
+        admit (Optional[Callable[[], ContextManager[None]]]): Admission
+            control held in this process while the worker runs.
+        result (Any): Return value of the job once it succeeded.
+        info (Dict[str, Any]): Details the job reported with its result.
+        error (Optional[Dict[str, Any]]): Status code and detail if it did not.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        func: Callable,
+        args: Tuple,
+        kwargs: Dict,
+        timeout: float,
+        params: Optional[Dict[str, Any]] = None,
+        admit: Optional[Callable[[], ContextManager[None]]] = None,
+    ):
+        self.job_id: str = uuid.uuid4().hex
+        self.kind: str = kind
+        self.params: Dict[str, Any] = params or {}
+        self.status: JobStatus = JobStatus.PENDING
+        self.timeout: float = timeout
+        self.result: Any = None
+        self.info: Dict[str, Any] = {}
+        self.error: Optional[Dict[str, Any]] = None
+        self.submitted_at: float = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.admit = admit
+        self.process = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in _FINISHED
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status.value,
+            "timeout": self.timeout,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "info": self.info,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """
+    Runs CPU-bound work in a bounded set of worker processes.
+
+    Each job gets its own process so it can be terminated on cancellation or
+    timeout. ``max_workers`` dispatcher threads take jobs from a bounded queue
+    in submission order; once ``max_pending`` jobs are waiting, submissions are
+    rejected with 429.
+
+    Attributes:
+        max_workers (int): Maximum number of concurrently running jobs.
+        default_timeout (float): Timeout applied when a job does not set one.
+        max_pending (int): Maximum number of jobs waiting to start.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        default_timeout: float = DEFAULT_TIMEOUT,
+        max_pending: int = MAX_PENDING_JOBS,
+    ):
+        self.max_workers: int = max_workers
+        self.default_timeout: float = default_timeout
+        self.max_pending: int = max_pending
+        self._queue: "queue.Queue[Job]" = queue.Queue(maxsize=max_pending)
+        self._dispatchers: List[threading.Thread] = []
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        kind: str,
+        func: Callable,
+        *args,
+        timeout: Optional[float] = None,
+        params: Optional[Dict[str, Any]] = None,
+        admit: Optional[Callable[[], ContextManager[None]]] = None,
+        **kwargs,
+    ) -> Job:
+        """
+        Queue a job and return immediately.
+
+        ``admit`` is entered once the job is dequeued and held while its worker
+        runs, so admission control sees jobs like any other detection. A job it
+        rejects ends as ``rejected`` with the status code it raised.
+        """
+        job = Job(
+            kind=kind,
+            func=func,
+            args=args,
+            kwargs=kwargs,
+            timeout=self.default_timeout if timeout is None else timeout,
+            params=params,
+            admit=admit,
+        )
+        with self._lock:
+            self._start_dispatchers()
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail=f"{self.max_pending} jobs are already waiting to start.",
+                ) from None
+            self._jobs[job.job_id] = job
+            self._prune()
+        return job
+
+    def get(self, job_id: str) -> Job:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Job not found: {job_id}",
+            )
+        return job
+
+    def cancel(self, job_id: str) -> Job:
+        """
+        Cancel a pending job or terminate a running one.
+        """
+        job = self.get(job_id)
+        with self._lock:
+            if job.finished:
+                return job
+            job.status = JobStatus.CANCELLED
+            job.finished_at = time.time()
+            process = job.process
+        if process is not None and process.is_alive():
+            process.terminate()
+        return job
+
+    def shutdown(self) -> None:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            if not job.finished:
+                self.cancel(job.job_id)
+
+    def _start_dispatchers(self) -> None:
+        # Started on first use so worker processes importing this module do
+        # not spawn idle threads.
+        while len(self._dispatchers) < self.max_workers:
+            thread = threading.Thread(target=self._dispatch, daemon=True)
+            thread.start()
+            self._dispatchers.append(thread)
+
+    def _dispatch(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                self._run(job)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job: Job) -> None:
+        with self._lock:
+            if job.status != JobStatus.PENDING:
+                return
+            job.status = JobStatus.RUNNING
+            job.started_at = time.time()
+
+        def register(process) -> None:
+            with self._lock:
+                job.process = process
+                cancelled = job.status == JobStatus.CANCELLED
+            if cancelled:
+                process.terminate()
+
+        try:
+            with job.admit() if job.admit is not None else nullcontext():
+                outcome, payload = run_in_process(
+                    job.func, job.args, job.kwargs, job.timeout, on_start=register
+                )
+        except HTTPException as exc:
+            outcome = JobStatus.REJECTED
+            payload = {"status_code": exc.status_code, "detail": exc.detail}
+        with self._lock:
+            job.process = None
+            job.func = job.args = job.kwargs = job.admit = None
+            if job.status == JobStatus.CANCELLED:
+                return
+            job.status = outcome
+            job.finished_at = time.time()
+            if outcome == JobStatus.SUCCEEDED and isinstance(payload, JobResult):
+                job.result, job.info = payload
+            elif outcome == JobStatus.SUCCEEDED:
+                job.result = payload
+            else:
+                job.error = payload
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+
+job_manager = JobManager()
+atexit.register(job_manager.shutdown)
@@ -0,0 +1,158 @@
+import time
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import networkx as nx
+import numpy as np
+from fastapi import HTTPException
+from fastapi import status
+
+from backend.tools.community_base import CommunityDetectionFactory
+from backend.tools.community_base import DEFAULT_SEED
+from backend.tools.custom_enums import CommunityAlgorithm
+from backend.tools.custom_enums import FileSize
+from backend.tools.graph_utils import node_label_array
+from backend.tools.incremental import align_labels
+from backend.tools.incremental import warm_start_label_propagation
+from backend.tools.incremental import warm_start_louvain
+from backend.tools.partition_metrics import partition_scores
+from backend.tools.path_selecter import path_selecter
+from backend.tools.path_selecter import resolve_dataset_files
+from backend.tools.result_store import result_store
+from backend.tools.time_windows import read_windowed_edges
+
+WARM_STARTS = {
+    CommunityAlgorithm.LOUVAIN: warm_start_louvain,
+    CommunityAlgorithm.LABEL_PROPAGATION: warm_start_label_propagation,
+}
+
+
+def _compute_windows(
+    algorithm: CommunityAlgorithm,
+    file_size: FileSize,
+    window: float,
+    step: Optional[float],
+    warm_start: bool,
+    seed: Optional[int],
+    **detector_options,
+) -> Dict[str, Any]:
+    try:
+        windowed = read_windowed_edges(
+            resolve_dataset_files(path_selecter(file_size=file_size)),
+            window=window,
+            step=step,
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
+
+    warm = WARM_STARTS.get(algorithm) if warm_start else None
+    previous: Optional[Dict[str, int]] = None
+    next_label = 0
+    summaries: List[Dict[str, Any]] = []
+    for time_window in windowed.windows:
+        G = time_window.to_networkx()
+        start = time.perf_counter()
+        if warm is not None:
+            partition = warm(G, previous, seed=seed)
+        else:
+            detector = CommunityDetectionFactory.get_community_detector(
+                algorithm, seed=seed, **detector_options
+            )
+            detected = detector.detect_communities(G)
+            partition = (
+                detected
+                if isinstance(detected, dict)
+                else {
+                    node: label
+                    for label, members in enumerate(detected)
+                    for node in members
+                }
+            )
+        runtime = time.perf_counter() - start
+        partition, next_label = align_labels(partition, previous, next_label)
+
+        summary: Dict[str, Any] = {
+            "start": time_window.start,
+            "end": time_window.end,
+            "num_lines": time_window.num_lines,
+            "num_nodes": G.number_of_nodes(),
+            "num_edges": G.number_of_edges(),
+            "num_communities": len(set(partition.values())),
+            "runtime_seconds": runtime,
+        }
+        communities: Dict[int, set] = {}
+        for node, label in partition.items():
+            communities.setdefault(label, set()).add(node)
+        summary["modularity"] = nx.community.modularity(
+            G, communities.values(), weight="weight"
+        )
+        if previous is not None:
+            common = [node for node in partition if node in previous]
+            summary["num_common_nodes"] = len(common)
+            summary["num_changed_nodes"] = sum(
+                partition[node] != previous[node] for node in common
+            )
+            summary["stability_nmi"] = partition_scores(
+                node_label_array(common, partition),
+                node_label_array(common, previous),
+            )["nmi"]
+        summary["partition"] = {
+            str(node): int(label) for node, label in partition.items()
+        }
+        summaries.append(summary)
+        previous = partition
+
+    return {
+        "algorithm": algorithm.value,
+        "file_size": file_size.value,
+        "window": windowed.window,
+        "step": windowed.step,
+        "warm_start": warm is not None,
+        "num_windows": len(summaries),
+        "total_runtime_seconds": float(
+            np.sum([summary["runtime_seconds"] for summary in summaries])
+        ),
+        "windows": summaries,
+    }
+
+
+def run_window_service(
+    algorithm: CommunityAlgorithm,
+    file_size: FileSize,
+    window: float,
+    step: Optional[float] = None,
+    warm_start: bool = True,
+    include_partitions: bool = False,
+    seed: Optional[int] = DEFAULT_SEED,
+    **detector_options,
+) -> Dict[str, Any]:
+    """
+    Detect communities in each time window of a dataset and track their drift.
+
+    The file is read once into tumbling (``step`` omitted) or sliding windows.
+    Louvain and label propagation warm-start each window from the previous
+    window's partition; other algorithms recompute every window. Labels are
+    aligned between windows so a community keeps its ID while it persists.
+    """
+    params = {
+        "window": window,
+        "step": step,
+        "warm_start": warm_start,
+        "seed": seed,
+        **detector_options,
+    }
+    key = result_store.make_key(f"windows:{algorithm.value}", file_size, params)
+    result = result_store.get_or_compute(
+        key,
+        lambda: _compute_windows(
+            algorithm, file_size, window, step, warm_start, seed, **detector_options
+        ),
+    )
+    if not include_partitions:
+        for summary in result["windows"]:
+            summary.pop("partition", None)
+    return result
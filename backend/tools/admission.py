@@ -0,0 +1,324 @@
+import math
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+from fastapi import HTTPException
+from fastapi import status
+
+from backend.tools.custom_enums import FileSize
+from backend.tools.graph_cache import BYTES_PER_EDGE
+from backend.tools.graph_cache import BYTES_PER_NODE
+from backend.tools.graph_cache import csr_cache
+from backend.tools.graph_cache import graph_cache
+from backend.tools.graph_snapshot import has_fresh_snapshot
+from backend.tools.graph_snapshot import read_snapshot_meta
+from backend.tools.graph_snapshot import snapshot_path
+from backend.tools.instrumentation import stage
+from backend.tools.path_selecter import path_selecter
+from backend.tools.path_selecter import resolve_dataset_files
+from backend.tools.reduction import GraphReduction
+from backend.tools.reduction import NO_REDUCTION
+from backend.tools.reduction import reduction_stats
+from backend.tools.result_store import result_store
+
+DEFAULT_MEMORY_BUDGET = int(os.environ.get("ADMISSION_MEMORY_BYTES", 4 * 1024**3))
+DEFAULT_QUEUE_TIMEOUT = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT_SECONDS", 30))
+DEFAULT_MAX_SECONDS = float(os.environ.get("ADMISSION_MAX_SECONDS", 1800))
+DEFAULT_MAX_CONCURRENT = int(os.environ.get("ADMISSION_MAX_CONCURRENT", 4))
+
+# Footprint of the CSR arrays of a graph and the sparse adjacency built from them.
+CSR_BYTES_PER_NODE = 64
+CSR_BYTES_PER_EDGE = 40
+
+GIB = 1024**3
+
+# Shortest plausible edge line, a timestamp and two hosts, and the compression
+# ratio assumed when a gzip trailer cannot tell a file's raw size. Together they
+# bound the size of a dataset that has not been parsed yet.
+MIN_EDGE_LINE_BYTES = 16
+MAX_GZIP_RATIO = 20
+
+
+class CostModel(NamedTuple):
+    """
+    Linear runtime and working-memory model of a detector.
+
+    Attributes:
+        seconds_per_node (float): Runtime per node.
+        seconds_per_edge (float): Runtime per undirected edge.
+        bytes_per_node (float): Working memory per node, on top of the input.
+        bytes_per_edge (float): Working memory per edge, on top of the input.
+    """
+
+    seconds_per_node: float
+    seconds_per_edge: float
+    bytes_per_node: float
+    bytes_per_edge: float
+
+
+class CostEstimate(NamedTuple):
+    """
+    Predicted resources of one detection run.
+
+    Attributes:
+        seconds (float): Expected runtime.
+        peak_bytes (int): Expected peak memory, input graph included.
+    """
+
+    seconds: float
+    peak_bytes: int
+
+
+def networkx_bytes(num_nodes: int, num_edges: int) -> int:
+    return num_nodes * BYTES_PER_NODE + num_edges * BYTES_PER_EDGE
+
+
+def csr_bytes(num_nodes: int, num_edges: int) -> int:
+    return num_nodes * CSR_BYTES_PER_NODE + num_edges * CSR_BYTES_PER_EDGE
+
+
+def linear_cost(
+    model: CostModel, num_nodes: int, num_edges: int, input_bytes: int
+) -> CostEstimate:
+    """
+    Apply a cost model to a graph whose input representation takes
+    ``input_bytes``.
+    """
+    return CostEstimate(
+        seconds=model.seconds_per_node * num_nodes + model.seconds_per_edge * num_edges,
+        peak_bytes=int(
+            input_bytes
+            + model.bytes_per_node * num_nodes
+            + model.bytes_per_edge * num_edges
+        ),
+    )
+
+
+def _cached_counts(file_size: FileSize) -> Optional[Dict[str, int]]:
+    """
+    Count a dataset from its snapshot metadata or a graph already in memory.
+    """
+    edges_file = path_selecter(file_size=file_size)
+    if has_fresh_snapshot(edges_file):
+        meta = read_snapshot_meta(snapshot_path(edges_file))
+        return {"nodes": meta["num_nodes"], "edges": meta["num_edges"]}
+    csr = csr_cache.peek(file_size)
+    if csr is not None:
+        return {"nodes": csr.num_nodes, "edges": csr.num_edges}
+    G = graph_cache.peek(file_size)
+    if G is not None:
+        return {"nodes": G.number_of_nodes(), "edges": G.number_of_edges()}
+    return None
+
+
+def graph_size(
+    file_size: FileSize, reduction: GraphReduction = NO_REDUCTION, load: bool = True
+) -> Optional[Tuple[int, int]]:
+    """
+    Return the number of nodes and edges of a dataset, or of its reduction.
+
+    Counts come from the result store, else from the snapshot metadata or a
+    graph already held by ``csr_cache`` or ``graph_cache``, and are then kept
+    in the result store. Only when none of them knows the counts is the graph
+    loaded, as the CSR arrays the detector is about to run on; with ``load``
+    unset, None is returned instead.
+    """
+    if reduction.active:
+        stats = result_store.get(
+            result_store.make_key("reduction", file_size, reduction.params)
+        )
+        if stats is None:
+            if not load:
+                return None
+            stats = reduction_stats(file_size, reduction)
+        return stats["nodes"], stats["edges"]
+
+    key = result_store.make_key("graph_size", file_size, {})
+    counts = result_store.get(key)
+    if counts is None:
+        counts = _cached_counts(file_size)
+        if counts is None:
+            if not load:
+                return None
+            csr = csr_cache.get(file_size)
+            counts = {"nodes": csr.num_nodes, "edges": csr.num_edges}
+        result_store.put(key, counts)
+    return counts["nodes"], counts["edges"]
+
+
+def _raw_size(path: str) -> int:
+    """
+    Read the uncompressed size of a gzip file from its trailer.
+
+    The trailer holds the size modulo 4 GiB, of the last member only; a value
+    below the compressed size cannot be right and the assumed ratio is used.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        if f.read(2) != b"\x1f\x8b":
+            return size
+        f.seek(-4, os.SEEK_END)
+        raw = int.from_bytes(f.read(4), "little")
+    return raw if raw >= size else size * MAX_GZIP_RATIO
+
+
+def graph_size_bound(file_size: FileSize) -> Tuple[int, int]:
+    """
+    Return the node and edge counts of a dataset, or upper bounds of them
+    taken from the size of its files when it has never been counted.
+
+    Reductions only remove nodes and edges, so this bounds them too.
+    """
+    size = graph_size(file_size, load=False)
+    if size is not None:
+        return size
+    raw = sum(
+        _raw_size(path)
+        for path in resolve_dataset_files(path_selecter(file_size=file_size))
+    )
+    num_edges = raw // MIN_EDGE_LINE_BYTES
+    return 2 * num_edges, num_edges
+
+
+class AdmissionController:
+    """
+    Gate in front of detection runs that bounds concurrency and memory.
+
+    Every algorithm has its own limit of concurrent runs and all runs share one
+    memory budget, reserved from their estimated peak. A run that could never
+    fit the budget or the runtime limit is rejected with 413 right away; one
+    that does not get a slot within the queue timeout is rejected with 429.
+
+    Attributes:
+        memory_budget (int): Bytes that admitted runs may reserve together.
+        queue_timeout (float): Seconds a run may wait for a slot.
+        max_seconds (float): Longest estimated runtime that is admitted.
+        reserved_bytes (int): Bytes reserved by the runs in progress.
+        admitted (int): Number of admitted runs.
+        rejected (int): Number of runs rejected as too large.
+        timed_out (int): Number of runs rejected after waiting in the queue.
+    """
+
+    def __init__(
+        self,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+        queue_timeout: float = DEFAULT_QUEUE_TIMEOUT,
+        max_seconds: float = DEFAULT_MAX_SECONDS,
+    ):
+        self.memory_budget: int = memory_budget
+        self.queue_timeout: float = queue_timeout
+        self.max_seconds: float = max_seconds
+        self.reserved_bytes: int = 0
+        self.admitted: int = 0
+        self.rejected: int = 0
+        self.timed_out: int = 0
+        self._running: Dict[str, int] = {}
+        self._waiting: Dict[str, int] = {}
+        self._condition = threading.Condition()
+
+    def check(self, name: str, estimate: CostEstimate) -> None:
+        """
+        Reject a run that exceeds the memory budget or runtime limit on its own.
+        """
+        if estimate.peak_bytes > self.memory_budget:
+            detail = (
+                f"{name} needs an estimated {estimate.peak_bytes / GIB:.2f} GiB, "
+                f"above the memory budget of {self.memory_budget / GIB:.2f} GiB."
+            )
+        elif estimate.seconds > self.max_seconds:
+            detail = (
+                f"{name} needs an estimated {estimate.seconds:.0f} s, above the "
+                f"limit of {self.max_seconds:.0f} s."
+            )
+        else:
+            return
+        with self._condition:
+            self.rejected += 1
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"{detail} Reduce the graph or pick a cheaper algorithm.",
+        )
+
+    def cap(self, estimate: CostEstimate) -> CostEstimate:
+        """
+        Clamp an upper-bound estimate to the limits, so a run of unknown size is
+        held alone instead of being rejected.
+        """
+        return CostEstimate(
+            seconds=min(estimate.seconds, self.max_seconds),
+            peak_bytes=min(estimate.peak_bytes, self.memory_budget),
+        )
+
+    @contextmanager
+    def admit(
+        self, name: str, estimate: CostEstimate, max_concurrent: int
+    ) -> Iterator[None]:
+        """
+        Hold a slot of ``name`` and reserve the estimated memory while the
+        block runs, waiting up to ``queue_timeout`` for both.
+        """
+        self.check(name, estimate)
+
+        def fits() -> bool:
+            return (
+                self._running.get(name, 0) < max_concurrent
+                and self.reserved_bytes + estimate.peak_bytes <= self.memory_budget
+            )
+
+        with stage("admission", peak_bytes=estimate.peak_bytes) as info:
+            with self._condition:
+                self._waiting[name] = self._waiting.get(name, 0) + 1
+                try:
+                    admitted = self._condition.wait_for(fits, self.queue_timeout)
+                finally:
+                    self._waiting[name] -= 1
+                if not admitted:
+                    self.timed_out += 1
+                else:
+                    self.admitted += 1
+                    self._running[name] = self._running.get(name, 0) + 1
+                    self.reserved_bytes += estimate.peak_bytes
+            info["outcome"] = "admitted" if admitted else "timed_out"
+        if not admitted:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=(
+                    f"{name} could not start within {self.queue_timeout:.0f} s: "
+                    "too many detections are running."
+                ),
+                headers={"Retry-After": str(math.ceil(self.queue_timeout))},
+            )
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._running[name] -= 1
+                self.reserved_bytes -= estimate.peak_bytes
+                self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return occupancy and counters for monitoring.
+        """
+        with self._condition:
+            return {
+                "memory_budget": self.memory_budget,
+                "reserved_bytes": self.reserved_bytes,
+                "queue_timeout": self.queue_timeout,
+                "max_seconds": self.max_seconds,
+                "running": {k: v for k, v in self._running.items() if v},
+                "waiting": {k: v for k, v in self._waiting.items() if v},
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+            }
+
+
+admission = AdmissionController()
@@ -1,23 +1,110 @@
+import importlib
+import time
 from abc import ABC
 from abc import abstractmethod
+from typing import Any
+from typing import Callable
 from typing import Dict
 from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
 from typing import Tuple
+from typing import Type
 from typing import Union
 
 import networkx as nx
-from sklearn.cluster import SpectralClustering
+import numpy as np
+from fastapi import Query
 
+from backend.tools.admission import CostEstimate
+from backend.tools.admission import CostModel
+from backend.tools.admission import csr_bytes
+from backend.tools.admission import DEFAULT_MAX_CONCURRENT
+from backend.tools.admission import linear_cost
+from backend.tools.admission import networkx_bytes
+from backend.tools.csr_communities import label_propagation_csr
+from backend.tools.csr_communities import louvain_csr
 from backend.tools.custom_enums import CommunityAlgorithm
+from backend.tools.custom_enums import DetectionBackend
+from backend.tools.custom_enums import FileSize
+from backend.tools.girvan_newman import BoundedGirvanNewman
+from backend.tools.girvan_newman import DEFAULT_REMOVAL_FRACTION
+from backend.tools.girvan_newman import DEFAULT_SAMPLE_SIZE
+from backend.tools.girvan_newman import DEFAULT_TIME_BUDGET
+from backend.tools.graph_cache import csr_cache
+from backend.tools.graph_cache import graph_cache
+from backend.tools.graph_snapshot import CSRGraph
 from backend.tools.graph_utils import create_html_visualization
-from backend.tools.graph_utils import read_edges_with_ports_to_graph
+from backend.tools.instrumentation import stage
+from backend.tools.reduction import GraphReduction
+from backend.tools.reduction import NO_REDUCTION
+from backend.tools.reduction import reduced_graphs
+
+DEFAULT_SEED = 42
+DEFAULT_N_CLUSTERS = 10
+DEFAULT_PARTS = 2
+DEFAULT_BALANCE_TOLERANCE = 0.05
+
+
+def detector_options_query(
+    seed: Optional[int] = DEFAULT_SEED,
+    n_clusters: int = Query(DEFAULT_N_CLUSTERS, ge=1),
+    per_component: bool = False,
+    target_communities: Optional[int] = Query(None, ge=1),
+    time_budget: Optional[float] = Query(DEFAULT_TIME_BUDGET, gt=0),
+    backend: DetectionBackend = DetectionBackend.NETWORKX,
+    k: int = Query(DEFAULT_PARTS, ge=1),
+    balance_tolerance: float = Query(DEFAULT_BALANCE_TOLERANCE, ge=0),
+) -> Dict[str, Any]:
+    """
+    Read the detector options of a request, as keyword arguments for
+    ``CommunityDetectionFactory.get_community_detector``.
+    """
+    return dict(
+        seed=seed,
+        n_clusters=n_clusters,
+        per_component=per_component,
+        target_communities=target_communities,
+        time_budget=time_budget,
+        backend=backend,
+        k=k,
+        balance_tolerance=balance_tolerance,
+    )
 
 
 class CommunityDetectionBase(ABC):
     """
     Abstract base class for community detection algorithms.
+
+    Attributes:
+        cost_model (CostModel): Runtime and working memory of a run, used by
+            admission control.
+        max_concurrent (int): Runs of the algorithm allowed at the same time.
+        cacheable (bool): Whether the last result may be kept in the result
+            store; a detector cut short before producing anything clears it.
     """
 
+    cost_model = CostModel(
+        seconds_per_node=5e-4,
+        seconds_per_edge=1e-5,
+        bytes_per_node=500,
+        bytes_per_edge=400,
+    )
+    max_concurrent = DEFAULT_MAX_CONCURRENT
+
+    def __init__(self, seed: Optional[int] = DEFAULT_SEED):
+        self.seed = seed
+        self.stats: Dict[str, Any] = {}
+        self.cacheable: bool = True
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        """
+        Parameters that influence the result, used to key cached partitions.
+        """
+        return {"seed": self.seed}
+
     @abstractmethod
     def detect_communities(
         self, G: nx.Graph
@@ -27,65 +114,339 @@ class CommunityDetectionBase(ABC):
         """
         pass
 
-    def run(self, path: str) -> Union[Dict[str, int], Tuple[List[str], ...]]:
+    def estimate_cost(self, num_nodes: int, num_edges: int) -> CostEstimate:
         """
-        Run the community detection algorithm on a graph built from the file.
+        Estimate the runtime and peak memory of a run on a graph of this size,
+        the NetworkX input graph included.
         """
-        G = read_edges_with_ports_to_graph(path)
-        return self.detect_communities(G)
+        return linear_cost(
+            self.cost_model, num_nodes, num_edges, networkx_bytes(num_nodes, num_edges)
+        )
+
+    def run(
+        self, file_size: FileSize, reduction: GraphReduction = NO_REDUCTION
+    ) -> Union[Dict[str, int], Tuple[List[str], ...]]:
+        """
+        Run the community detection algorithm on the cached graph of the dataset.
+
+        An active ``reduction`` is applied to the CSR arrays of the dataset and
+        the detector runs on the reduced graph. The cached NetworkX graph is
+        built with ``CSRGraph.to_networkx``, like the graph ``detect_csr``
+        hands to ``detect_communities``, so both paths see the same node and
+        edge order and store interchangeable results under one key.
+        """
+        if reduction.active:
+            return self.run_csr(file_size, reduction)
+        G = graph_cache.get(file_size)
+        with stage("detect", nodes=G.number_of_nodes(), edges=G.number_of_edges()):
+            return self.detect_communities(G)
+
+    def run_csr(
+        self, file_size: FileSize, reduction: GraphReduction = NO_REDUCTION
+    ) -> Union[Dict[str, int], Tuple[List[str], ...]]:
+        """
+        Run the community detection algorithm on the dataset loaded as CSR arrays.
+        """
+        if reduction.active:
+            csr, _ = reduced_graphs.get(file_size, reduction)
+        else:
+            csr = csr_cache.get(file_size)
+        with stage("detect", nodes=csr.num_nodes):
+            return self.detect_csr(csr)
 
-    def run_viz(self, path: str) -> str:
+    def detect_csr(self, csr: CSRGraph) -> Union[Dict[str, int], Tuple[List[str], ...]]:
+        """
+        Detect communities on a graph held as CSR arrays.
+
+        NetworkX detectors run on ``csr.to_networkx()``, the one conversion
+        used for every NetworkX graph of a dataset.
+        """
+        return self.detect_communities(csr.to_networkx())
+
+    def run_viz(self, file_size: FileSize) -> str:
         """
         Run the community detection algorithm and create an HTML visualization.
         """
-        G = read_edges_with_ports_to_graph(path)
-        communities = self.detect_communities(G)
+        G = graph_cache.get(file_size)
+        with stage("detect", nodes=G.number_of_nodes(), edges=G.number_of_edges()):
+            communities = self.detect_communities(G)
         return create_html_visualization(G, communities)
 
 
-class LabelPropagation(CommunityDetectionBase):
+def normalize_partition(
+    partition: Union[Dict[str, int], Tuple[List[str], ...]]
+) -> Union[Dict[str, int], List[List[str]]]:
+    """
+    Convert a detector's output into plain JSON types with a stable order.
+    """
+    if isinstance(partition, dict):
+        return {str(node): int(label) for node, label in partition.items()}
+    return [sorted(str(node) for node in community) for community in partition]
+
+
+def detect_on_csr(
+    G: nx.Graph, engine: Callable[..., np.ndarray], seed: Optional[int]
+) -> Dict[str, int]:
+    """
+    Run an array engine on the CSR adjacency of a graph and map labels back.
+    """
+    nodes = list(G)
+    labels = engine(CSRGraph.from_networkx(G).adjacency(), seed=seed)
+    return dict(zip(nodes, labels.tolist()))
+
+
+class BackendDetectionBase(CommunityDetectionBase):
+    """
+    Detector with a NetworkX implementation and an array-based alternative.
+
+    With the array backend, ``run`` loads the dataset straight into CSR arrays
+    and never builds a NetworkX graph.
+
+    Attributes:
+        backend (DetectionBackend): Implementation used to detect communities.
+    """
+
+    array_engine: Callable[..., np.ndarray]
+    # Fits both array engines on the Large dataset.
+    array_cost_model = CostModel(
+        seconds_per_node=5e-5,
+        seconds_per_edge=2e-6,
+        bytes_per_node=100,
+        bytes_per_edge=200,
+    )
+
+    def __init__(
+        self,
+        seed: Optional[int] = DEFAULT_SEED,
+        backend: DetectionBackend = DetectionBackend.NETWORKX,
+    ):
+        super().__init__(seed=seed)
+        self.backend = backend
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return {**super().params, "backend": self.backend.value}
+
+    def detect_csr(self, csr: CSRGraph) -> Dict[str, int]:
+        if self.backend != DetectionBackend.ARRAY:
+            return super().detect_csr(csr)
+        labels = type(self).array_engine(csr.adjacency(), seed=self.seed)
+        return dict(zip(csr.node_labels(), labels.tolist()))
+
+    def estimate_cost(self, num_nodes: int, num_edges: int) -> CostEstimate:
+        if self.backend != DetectionBackend.ARRAY:
+            return super().estimate_cost(num_nodes, num_edges)
+        return linear_cost(
+            self.array_cost_model,
+            num_nodes,
+            num_edges,
+            csr_bytes(num_nodes, num_edges),
+        )
+
+    def run(
+        self, file_size: FileSize, reduction: GraphReduction = NO_REDUCTION
+    ) -> Dict[str, int]:
+        if self.backend == DetectionBackend.ARRAY:
+            return self.run_csr(file_size, reduction)
+        return super().run(file_size, reduction)
+
+
+class LabelPropagation(BackendDetectionBase):
+    array_engine = label_propagation_csr
+    cost_model = CostModel(
+        seconds_per_node=5e-4,
+        seconds_per_edge=1e-5,
+        bytes_per_node=200,
+        bytes_per_edge=50,
+    )
+
     def detect_communities(self, G: nx.Graph) -> Dict[str, int]:
-        communities = nx.community.label_propagation_communities(G)
+        if self.backend == DetectionBackend.ARRAY:
+            return detect_on_csr(G, label_propagation_csr, self.seed)
+        communities = nx.community.asyn_lpa_communities(
+            G, weight="weight", seed=self.seed
+        )
         return {
             node: i for i, community in enumerate(communities) for node in community
         }
 
 
-class Louvain(CommunityDetectionBase):
+class Louvain(BackendDetectionBase):
+    array_engine = louvain_csr
+    cost_model = CostModel(
+        seconds_per_node=5e-4,
+        seconds_per_edge=1e-5,
+        bytes_per_node=500,
+        bytes_per_edge=350,
+    )
+
     def detect_communities(self, G: nx.Graph) -> Dict[str, int]:
-        partition = nx.community.louvain_communities(G)
+        if self.backend == DetectionBackend.ARRAY:
+            return detect_on_csr(G, louvain_csr, self.seed)
+        partition = nx.community.louvain_communities(G, seed=self.seed)
         return {node: i for i, community in enumerate(partition) for node in community}
 
 
 class GirvanNewman(CommunityDetectionBase):
-    def detect_communities(self, G: nx.Graph) -> Tuple[List[str], ...]:
-        comp = nx.community.girvan_newman(G)
-        return tuple(sorted(c) for c in next(comp))
+    # A copy of the graph plus edge betweenness scores. Scoring the levels
+    # comes on top of the search, so ``time_budget`` is overrun on large graphs.
+    cost_model = CostModel(
+        seconds_per_node=0,
+        seconds_per_edge=3e-4,
+        bytes_per_node=600,
+        bytes_per_edge=750,
+    )
+    max_concurrent = 1
+
+    def __init__(
+        self,
+        seed: Optional[int] = DEFAULT_SEED,
+        target_communities: Optional[int] = None,
+        time_budget: Optional[float] = DEFAULT_TIME_BUDGET,
+    ):
+        super().__init__(seed=seed)
+        self.target_communities = target_communities
+        self.time_budget = time_budget
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return {
+            **super().params,
+            "target_communities": self.target_communities,
+            "time_budget": self.time_budget,
+        }
 
+    def estimate_cost(self, num_nodes: int, num_edges: int) -> CostEstimate:
+        """
+        Add the betweenness search: a sampled pass over the edges per batch of
+        removed edges, repeated over about ``log2(n)`` levels of splits and cut
+        short by ``time_budget``.
+        """
+        estimate = super().estimate_cost(num_nodes, num_edges)
+        passes = np.log2(max(num_nodes, 2)) / DEFAULT_REMOVAL_FRACTION
+        search = 1e-6 * DEFAULT_SAMPLE_SIZE * num_edges * passes
+        if self.time_budget is not None:
+            search = min(search, self.time_budget)
+        return estimate._replace(seconds=estimate.seconds + search)
 
-class SpectralClusteringAlgorithm(CommunityDetectionBase):
     def detect_communities(self, G: nx.Graph) -> Dict[str, int]:
         """
-        Detect communities using spectral clustering.
+        Detect communities with a bounded, approximate Girvan-Newman and return
+        the level with the best modularity.
         """
-        adjacency_matrix = nx.to_numpy_array(G)
-        clustering = SpectralClustering(
-            n_clusters=min(10, len(G.nodes)), affinity="precomputed", random_state=42
-        ).fit(adjacency_matrix)
-        return {
-            str(node): int(label) for node, label in zip(G.nodes(), clustering.labels_)
-        }
+        girvan_newman = BoundedGirvanNewman(
+            target_communities=self.target_communities,
+            time_budget=self.time_budget,
+            seed=self.seed,
+        )
+        partition = girvan_newman.fit(G)
+        self.stats.update(girvan_newman.summary())
+        # Without a single split the result only reflects the time budget, so
+        # a later run with more time must not be served this one.
+        self.cacheable = girvan_newman.levels > 0
+        return partition
 
 
 class ModularityMaximization(CommunityDetectionBase):
-    def detect_communities(self, G: nx.Graph) -> Dict[str, int]:
-        return nx.community.greedy_modularity_communities(G)
+    cost_model = CostModel(
+        seconds_per_node=0, seconds_per_edge=0, bytes_per_node=1000, bytes_per_edge=400
+    )
+    max_concurrent = 1
 
+    def estimate_cost(self, num_nodes: int, num_edges: int) -> CostEstimate:
+        """
+        Greedy merging grows faster than the number of edges; ``m ** 1.5``
+        matches runs on samples of the Large dataset.
+        """
+        estimate = super().estimate_cost(num_nodes, num_edges)
+        return estimate._replace(seconds=3e-6 * num_edges**1.5)
 
-class KernighanLinAlgorithm(CommunityDetectionBase):
     def detect_communities(self, G: nx.Graph) -> Dict[str, int]:
-        partition = nx.algorithms.community.kernighan_lin_bisection(G)
-        return {node: idx for idx, group in enumerate(partition) for node in group}
+        return nx.community.greedy_modularity_communities(G, weight="weight")
+
+
+class AlgorithmSpec(NamedTuple):
+    """
+    Where a detector lives and which factory options it accepts.
+
+    Attributes:
+        module (str): Module that defines the detector class.
+        class_name (str): Name of the detector class in that module.
+        options (Tuple[str, ...]): Factory options passed on to the constructor,
+            besides ``seed``.
+    """
+
+    module: str
+    class_name: str
+    options: Tuple[str, ...] = ()
+
+
+# Detectors are imported on first use so that importing the app does not pull
+# in scikit-learn and friends for requests that never run them.
+_ALGORITHMS: Dict[CommunityAlgorithm, AlgorithmSpec] = {
+    CommunityAlgorithm.LOUVAIN: AlgorithmSpec(__name__, "Louvain", ("backend",)),
+    CommunityAlgorithm.LABEL_PROPAGATION: AlgorithmSpec(
+        __name__, "LabelPropagation", ("backend",)
+    ),
+    CommunityAlgorithm.GIRVAN_NEWMAN: AlgorithmSpec(
+        __name__, "GirvanNewman", ("target_communities", "time_budget")
+    ),
+    CommunityAlgorithm.SPECTRAL: AlgorithmSpec(
+        "backend.tools.spectral",
+        "SpectralClusteringAlgorithm",
+        ("n_clusters", "per_component"),
+    ),
+    CommunityAlgorithm.MODULARITY: AlgorithmSpec(__name__, "ModularityMaximization"),
+    CommunityAlgorithm.KERNIGHAN_LIN: AlgorithmSpec(
+        "backend.tools.multilevel",
+        "KernighanLinAlgorithm",
+        ("k", "balance_tolerance"),
+    ),
+    CommunityAlgorithm.PORT_PROFILE: AlgorithmSpec(
+        "backend.tools.port_profile", "PortProfileAlgorithm", ("n_clusters",)
+    ),
+}
+
+
+def register_algorithm(
+    algorithm: CommunityAlgorithm,
+    module: str,
+    class_name: str,
+    options: Sequence[str] = (),
+) -> None:
+    """
+    Register the detector class used for an algorithm.
+    """
+    _ALGORITHMS[algorithm] = AlgorithmSpec(module, class_name, tuple(options))
+
+
+def load_algorithm(algorithm: CommunityAlgorithm) -> Type[CommunityDetectionBase]:
+    """
+    Import and return the detector class of an algorithm.
+    """
+    spec = _ALGORITHMS.get(algorithm)
+    if spec is None:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+    return getattr(importlib.import_module(spec.module), spec.class_name)
+
+
+def warm_up(
+    algorithms: Optional[Sequence[CommunityAlgorithm]] = None,
+) -> Dict[str, float]:
+    """
+    Import detectors and the visualization stack ahead of the first request.
+
+    Returns the seconds spent per algorithm, plus ``viz`` for Plotly.
+    """
+    timings = {}
+    for algorithm in algorithms or list(_ALGORITHMS):
+        start = time.perf_counter()
+        load_algorithm(algorithm)
+        timings[algorithm.value] = time.perf_counter() - start
+    start = time.perf_counter()
+    importlib.import_module("plotly.graph_objects")
+    timings["viz"] = time.perf_counter() - start
+    return timings
 
 
 class CommunityDetectionFactory:
@@ -94,18 +455,28 @@ class CommunityDetectionFactory:
     """
 
     @staticmethod
-    def get_community_detector(algorithm: CommunityAlgorithm) -> CommunityDetectionBase:
-        if algorithm == CommunityAlgorithm.LOUVAIN:
-            return Louvain()
-        elif algorithm == CommunityAlgorithm.LABEL_PROPAGATION:
-            return LabelPropagation()
-        elif algorithm == CommunityAlgorithm.GIRVAN_NEWMAN:
-            return GirvanNewman()
-        elif algorithm == CommunityAlgorithm.SPECTRAL:
-            return SpectralClusteringAlgorithm()
-        elif algorithm == CommunityAlgorithm.MODULARITY:
-            return ModularityMaximization()
-        elif algorithm == CommunityAlgorithm.KERNIGHAN_LIN:
-            return KernighanLinAlgorithm()
-        else:
-            raise ValueError(f"Unknown algorithm: {algorithm}")
+    def get_community_detector(
+        algorithm: CommunityAlgorithm,
+        seed: Optional[int] = DEFAULT_SEED,
+        n_clusters: int = DEFAULT_N_CLUSTERS,
+        per_component: bool = False,
+        target_communities: Optional[int] = None,
+        time_budget: Optional[float] = DEFAULT_TIME_BUDGET,
+        backend: DetectionBackend = DetectionBackend.NETWORKX,
+        k: int = DEFAULT_PARTS,
+        balance_tolerance: float = DEFAULT_BALANCE_TOLERANCE,
+    ) -> CommunityDetectionBase:
+        detector_class = load_algorithm(algorithm)
+        options = {
+            "n_clusters": n_clusters,
+            "per_component": per_component,
+            "target_communities": target_communities,
+            "time_budget": time_budget,
+            "backend": backend,
+            "k": k,
+            "balance_tolerance": balance_tolerance,
+        }
+        return detector_class(
+            seed=seed,
+            **{name: options[name] for name in _ALGORITHMS[algorithm].options},
+        )
@@ -8,6 +8,7 @@ class CommunityAlgorithm(str, Enum):
     SPECTRAL = "Spectral Clustering"
     MODULARITY = "Modularity Maximization"
     KERNIGHAN_LIN = "Kernighan-Lin"
+    PORT_PROFILE = "Port Profile"
 
 
 class FileSize(str, Enum):
@@ -16,3 +17,35 @@ class FileSize(str, Enum):
     SMALL_4D = "Small 4 days"
     SMALL_12H = "Small 12 hours"
     TEST = "Test"
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    TIMED_OUT = "timed_out"
+    REJECTED = "rejected"
+
+
+class VizMode(str, Enum):
+    AUTO = "auto"
+    FULL = "full"
+    COMMUNITIES = "communities"
+
+
+class DetectionBackend(str, Enum):
+    NETWORKX = "networkx"
+    ARRAY = "array"
+
+
+class OutputFormat(str, Enum):
+    JSON = "json"
+    NDJSON = "ndjson"
+    JSON_STREAM = "json-stream"
+
+
+class EdgeSampling(str, Enum):
+    UNIFORM = "uniform"
+    WEIGHTED = "weighted"
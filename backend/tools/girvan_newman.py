@@ -0,0 +1,277 @@
+import heapq
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+from typing import Dict
+from typing import Hashable
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+import networkx as nx
+
+DEFAULT_SAMPLE_SIZE = 128
+DEFAULT_TIME_BUDGET = 30.0
+# Share of a component's edges removed, highest betweenness first, before its
+# betweenness is recomputed. A split always triggers a recomputation.
+DEFAULT_REMOVAL_FRACTION = 0.02
+# Share of the time budget one recomputation may take; its source sample
+# shrinks to fit, so that edge removals are left time even on the first one.
+DEFAULT_RESCORE_SHARE = 0.05
+DEFAULT_WORKERS = int(os.environ.get("GIRVAN_NEWMAN_WORKERS", os.cpu_count() or 1))
+# Components smaller than this are scored in-process; shipping them to a worker
+# costs more than the betweenness computation itself.
+PARALLEL_MIN_NODES = 2000
+# Most sources scored per task; the time budget is checked between rounds.
+SOURCES_PER_TASK = 16
+
+Edge = Tuple[Hashable, Hashable]
+
+
+def _edge_betweenness_from_sources(
+    G: nx.Graph, sources: List[Hashable]
+) -> Dict[Edge, float]:
+    return nx.edge_betweenness_centrality_subset(
+        G, sources=sources, targets=list(G), normalized=False
+    )
+
+
+class _Community:
+    """
+    Modularity terms of one community: internal edge weight and degree sum.
+    """
+
+    def __init__(self, nodes: Set[Hashable], G: nx.Graph, weight: str):
+        self.nodes = nodes
+        # One pass over the adjacency; a subgraph view filters every lookup.
+        # A self-loop counts twice towards the degree, as in NetworkX.
+        internal = degree = 0.0
+        for u in nodes:
+            for v, data in G.adj[u].items():
+                w = data.get(weight, 1)
+                if v == u:
+                    w *= 2
+                degree += w
+                if v in nodes:
+                    internal += w
+        self.internal = internal / 2
+        self.degree = degree
+
+    def modularity(self, total_weight: float) -> float:
+        if total_weight == 0:
+            return 0.0
+        return self.internal / total_weight - (self.degree / (2 * total_weight)) ** 2
+
+
+class BoundedGirvanNewman:
+    """
+    Girvan-Newman divisive clustering with approximate, bounded work.
+
+    Edge betweenness is estimated from a sample of source nodes and only
+    recomputed for the component that changed, after a small batch of its top
+    edges was removed or as soon as it split. Large components can spread the
+    sources over a process pool. The run stops at a target community count,
+    a time budget or when no edges remain, and keeps the level with the best
+    modularity on the original graph.
+
+    Attributes:
+        levels (int): Number of splits performed.
+        best_modularity (float): Modularity of the returned partition.
+        stop_reason (str): Why the run stopped.
+    """
+
+    def __init__(
+        self,
+        target_communities: Optional[int] = None,
+        time_budget: Optional[float] = DEFAULT_TIME_BUDGET,
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+        removal_fraction: float = DEFAULT_REMOVAL_FRACTION,
+        rescore_share: float = DEFAULT_RESCORE_SHARE,
+        workers: int = DEFAULT_WORKERS,
+        seed: Optional[int] = None,
+        weight: str = "weight",
+    ):
+        self.target_communities = target_communities
+        self.time_budget = time_budget
+        self.sample_size = sample_size
+        self.removal_fraction = removal_fraction
+        self.rescore_share = rescore_share
+        self.workers = workers
+        self.weight = weight
+        self._rng = random.Random(seed)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.levels: int = 0
+        self.best_modularity: float = 0.0
+        self.stop_reason: str = ""
+
+    def _betweenness(
+        self, H: nx.Graph, nodes: Set[Hashable], deadline: Optional[float]
+    ) -> Dict[Edge, float]:
+        """
+        Sum the betweenness of a sample of sources, scored in rounds.
+
+        With a ``deadline``, the first round scores one source per task and
+        later rounds only as many as the time per source so far allows, within
+        ``rescore_share`` of the time budget, so the sample shrinks to fit.
+        Returns no scores when even the first round starts too late.
+        """
+        # Betweenness walks the graph once per source: a plain graph is much
+        # faster to walk than a subgraph view filtering every neighbor.
+        if len(nodes) == H.number_of_nodes():
+            graph = H
+        else:
+            graph = nx.Graph(H.subgraph(nodes))
+        candidates = list(nodes)
+        sources = (
+            self._rng.sample(candidates, self.sample_size)
+            if len(candidates) > self.sample_size
+            else candidates
+        )
+        parallel = self.workers > 1 and len(nodes) >= PARALLEL_MIN_NODES
+        if parallel and self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        tasks_per_round = self.workers if parallel else 1
+
+        totals: Dict[Edge, float] = {}
+        started = time.monotonic()
+        if deadline is not None:
+            stop = min(deadline, started + self.time_budget * self.rescore_share)
+        done = 0
+        while done < len(sources):
+            size = SOURCES_PER_TASK * tasks_per_round
+            if deadline is not None:
+                now = time.monotonic()
+                if not done:
+                    # One source per task first, to time a source on this graph.
+                    size = tasks_per_round if now < deadline else 0
+                else:
+                    per_source = (now - started) / done
+                    if per_source > 0:
+                        size = min(size, int((stop - now) / per_source))
+                if size < 1:
+                    break
+            chunk = sources[done : done + size]
+            if parallel:
+                tasks = [chunk[i :: self.workers] for i in range(self.workers)]
+                tasks = [task for task in tasks if task]
+                partials = self._executor.map(
+                    _edge_betweenness_from_sources, [graph] * len(tasks), tasks
+                )
+            else:
+                partials = [_edge_betweenness_from_sources(graph, chunk)]
+            for partial in partials:
+                for edge, value in partial.items():
+                    totals[edge] = totals.get(edge, 0.0) + value
+            done += len(chunk)
+        return totals
+
+    def fit(self, G: nx.Graph) -> Dict[Hashable, int]:
+        """
+        Run the bounded divisive process and return the best node -> community map.
+        """
+        deadline = (
+            None if self.time_budget is None else time.monotonic() + self.time_budget
+        )
+        total_weight = G.size(weight=self.weight)
+        H = nx.Graph(G.edges())
+        H.add_nodes_from(G)
+        H.remove_edges_from(list(nx.selfloop_edges(H)))
+
+        communities: Dict[int, _Community] = {
+            idx: _Community(set(nodes), G, self.weight)
+            for idx, nodes in enumerate(nx.connected_components(H))
+        }
+        next_id = len(communities)
+        score = sum(c.modularity(total_weight) for c in communities.values())
+        best_score, best_sets = score, [c.nodes for c in communities.values()]
+
+        # Max-heap of each component's current batch of top edges; entries are
+        # invalidated by bumping the component's version.
+        versions: Dict[int, int] = {}
+        pending: Dict[int, int] = {}
+        heap: List[Tuple[float, int, int, Edge]] = []
+
+        def out_of_time() -> bool:
+            return deadline is not None and time.monotonic() > deadline
+
+        def rescore(idx: int) -> None:
+            versions[idx] = versions.get(idx, 0) + 1
+            scores = self._betweenness(H, communities[idx].nodes, deadline)
+            if not scores:
+                self.stop_reason = "time budget exhausted"
+            batch = max(1, int(len(scores) * self.removal_fraction))
+            top = heapq.nlargest(batch, scores.items(), key=lambda item: item[1])
+            pending[idx] = len(top)
+            for edge, value in top:
+                heapq.heappush(heap, (-value, idx, versions[idx], edge))
+
+        self.stop_reason = "no edges left"
+        try:
+            for idx, community in communities.items():
+                if out_of_time():
+                    self.stop_reason = "time budget exhausted"
+                    break
+                if len(community.nodes) > 1:
+                    rescore(idx)
+
+            while heap:
+                if (
+                    self.target_communities
+                    and len(communities) >= self.target_communities
+                ):
+                    self.stop_reason = "target community count reached"
+                    break
+                if out_of_time():
+                    self.stop_reason = "time budget exhausted"
+                    break
+                _, idx, version, (u, v) = heapq.heappop(heap)
+                if versions.get(idx) != version:
+                    continue
+                H.remove_edge(u, v)
+                if nx.has_path(H, u, v):
+                    pending[idx] -= 1
+                    if not pending[idx]:
+                        rescore(idx)
+                    continue
+
+                # The component split in two: update modularity incrementally.
+                old = communities.pop(idx)
+                versions.pop(idx)
+                pending.pop(idx)
+                part = nx.node_connected_component(H, u)
+                halves = (
+                    _Community(part, G, self.weight),
+                    _Community(old.nodes - part, G, self.weight),
+                )
+                score += sum(c.modularity(total_weight) for c in halves)
+                score -= old.modularity(total_weight)
+                for half in halves:
+                    communities[next_id] = half
+                    if len(half.nodes) > 1:
+                        rescore(next_id)
+                    next_id += 1
+                self.levels += 1
+                if score > best_score:
+                    best_score = score
+                    best_sets = [c.nodes for c in communities.values()]
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+        self.best_modularity = best_score
+        return {node: label for label, nodes in enumerate(best_sets) for node in nodes}
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "levels": self.levels,
+            "best_modularity": self.best_modularity,
+            "stop_reason": self.stop_reason,
+        }
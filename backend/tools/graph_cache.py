@@ -0,0 +1,200 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import networkx as nx
+
+from backend.tools.custom_enums import FileSize
+from backend.tools.graph_snapshot import CSRGraph
+from backend.tools.graph_snapshot import load_csr
+from backend.tools.instrumentation import stage
+from backend.tools.path_selecter import dataset_stat
+from backend.tools.path_selecter import path_selecter
+
+# Rough per-element footprint of a NetworkX graph (dict-of-dicts adjacency).
+BYTES_PER_NODE = 600
+BYTES_PER_EDGE = 450
+
+DEFAULT_MAX_BYTES = int(os.environ.get("GRAPH_CACHE_MAX_BYTES", 2 * 1024**3))
+
+CacheKey = Tuple[FileSize, str, int]
+Graph = Union[nx.Graph, CSRGraph]
+
+
+def estimate_graph_bytes(G: nx.Graph) -> int:
+    """
+    Estimate the in-memory footprint of a NetworkX graph.
+    """
+    return G.number_of_nodes() * BYTES_PER_NODE + G.number_of_edges() * BYTES_PER_EDGE
+
+
+def estimate_csr_bytes(csr: CSRGraph) -> int:
+    """
+    Size of the arrays of a CSR graph.
+    """
+    return sum(
+        getattr(csr, name).nbytes
+        for name in ("nodes", "offsets", "neighbors", "weights")
+    )
+
+
+class _PendingLoad:
+    """
+    A graph load in progress that other callers can wait on.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.graph: Optional[Graph] = None
+        self.error: Optional[BaseException] = None
+
+
+def load_csr_entry(key: CacheKey) -> CSRGraph:
+    return load_csr(key[1])
+
+
+def load_networkx_entry(key: CacheKey) -> nx.Graph:
+    """
+    Build the NetworkX graph of a dataset from its cached CSR arrays.
+
+    The file is parsed once for both caches and every NetworkX graph has the
+    canonical ``CSRGraph.to_networkx`` node and edge order.
+    """
+    csr = csr_cache.get(key[0])
+    with stage("to_networkx", nodes=csr.num_nodes):
+        return csr.to_networkx()
+
+
+class GraphCache:
+    """
+    Process-wide LRU cache of parsed graphs keyed by dataset.
+
+    By default graphs are NetworkX graphs built from ``csr_cache``; a different
+    loader and sizer let the same cache hold other representations such as
+    ``CSRGraph``.
+
+    Entries are keyed by file size, resolved path and modification time, so a
+    rewritten file is parsed again. Concurrent requests for the same file wait
+    on a single parse.
+
+    Attributes:
+        max_bytes (int): Memory budget for all cached graphs.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that triggered a parse.
+        evictions (int): Number of graphs evicted to stay within the budget.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        loader: Callable[[CacheKey], Graph] = load_networkx_entry,
+        sizer: Callable[[Graph], int] = estimate_graph_bytes,
+    ):
+        self.max_bytes: int = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._loader = loader
+        self._sizer = sizer
+        self._entries: "OrderedDict[CacheKey, Tuple[Graph, int]]" = OrderedDict()
+        self._pending: Dict[CacheKey, _PendingLoad] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(file_size: FileSize) -> CacheKey:
+        """
+        Build the cache key for a dataset from its resolved path and latest mtime.
+        """
+        path = os.path.realpath(path_selecter(file_size=file_size))
+        return file_size, path, dataset_stat(path)[2]
+
+    def peek(self, file_size: FileSize) -> Optional[Graph]:
+        """
+        Return the cached graph of a dataset, or None, without loading it or
+        touching the LRU order and counters.
+        """
+        key = self.make_key(file_size)
+        with self._lock:
+            entry = self._entries.get(key)
+        return None if entry is None else entry[0]
+
+    def get(self, file_size: FileSize) -> Graph:
+        """
+        Return the parsed graph for a dataset, loading it on first use.
+        """
+        key = self.make_key(file_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = _PendingLoad()
+                self._pending[key] = pending
+
+        if not owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.graph
+
+        try:
+            pending.graph = self._loader(key)
+            self._store(key, pending.graph)
+        except BaseException as exc:
+            pending.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            pending.done.set()
+        return pending.graph
+
+    def _store(self, key: CacheKey, G: Graph) -> None:
+        size = self._sizer(G)
+        with self._lock:
+            # Drop stale versions of the same dataset before inserting.
+            for stale in [k for k in self._entries if k[0] == key[0] and k != key]:
+                del self._entries[stale]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (G, size)
+            while self.current_bytes > self.max_bytes:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    @property
+    def current_bytes(self) -> int:
+        return sum(size for _, size in self._entries.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Return counters and occupancy for monitoring.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "datasets": [key[0].value for key in self._entries],
+            }
+
+
+csr_cache = GraphCache(loader=load_csr_entry, sizer=estimate_csr_bytes)
+graph_cache = GraphCache()
@@ -0,0 +1,393 @@
+import argparse
+import json
+import os
+import re
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+
+from backend.tools.custom_enums import FileSize
+from backend.tools.graph_utils import EdgeAggregate
+from backend.tools.graph_utils import read_weighted_edges_from_files
+from backend.tools.instrumentation import stage
+from backend.tools.path_selecter import dataset_stat
+from backend.tools.path_selecter import path_selecter
+from backend.tools.path_selecter import resolve_dataset_files
+
+SNAPSHOT_SUFFIX = ".snapshot"
+SNAPSHOT_VERSION = 2
+
+CSR_ARRAYS = (
+    "nodes",
+    "offsets",
+    "neighbors",
+    "weights",
+    "port_table",
+    "port_offsets",
+    "port_ids",
+)
+
+
+def _symmetric_csr(
+    num_nodes: int, u: np.ndarray, v: np.ndarray, w: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Build CSR offsets, neighbors and weights listing every edge in both
+    directions from unique undirected edges.
+    """
+    loops = u == v
+    src = np.concatenate([u, v[~loops]])
+    dst = np.concatenate([v, u[~loops]])
+    wgt = np.concatenate([w, w[~loops]])
+    order = np.lexsort((dst, src))
+    counts = np.bincount(src, minlength=num_nodes)
+    offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets, dst[order].astype(np.int32), wgt[order].astype(np.int32)
+
+
+class CSRGraph:
+    """
+    Undirected graph stored as compressed sparse row arrays.
+
+    Every edge appears in the neighbor lists of both endpoints. When loaded from
+    a snapshot the arrays are read-only memory maps, so processes loading the
+    same snapshot share the page-cached data instead of holding private copies.
+
+    Attributes:
+        nodes (np.ndarray): Interned node IDs as fixed-width bytes, indexed by node.
+        offsets (np.ndarray): Start of each node's neighbor slice (length N + 1).
+        neighbors (np.ndarray): Concatenated neighbor indices.
+        weights (np.ndarray): Number of flows observed for each neighbor entry.
+        port_table (np.ndarray): Interned port tokens as fixed-width bytes.
+        port_offsets (np.ndarray): Start of each node's port slice (length N + 1).
+        port_ids (np.ndarray): Concatenated port indices seen per node.
+    """
+
+    def __init__(
+        self,
+        nodes: np.ndarray,
+        offsets: np.ndarray,
+        neighbors: np.ndarray,
+        weights: np.ndarray,
+        port_table: Optional[np.ndarray] = None,
+        port_offsets: Optional[np.ndarray] = None,
+        port_ids: Optional[np.ndarray] = None,
+    ):
+        self.nodes = nodes
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.weights = weights
+        self.port_table = (
+            port_table if port_table is not None else np.array([], dtype=np.bytes_)
+        )
+        self.port_offsets = (
+            port_offsets
+            if port_offsets is not None
+            else np.zeros(len(nodes) + 1, dtype=np.int64)
+        )
+        self.port_ids = (
+            port_ids if port_ids is not None else np.array([], dtype=np.int32)
+        )
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def num_edges(self) -> int:
+        src = np.repeat(np.arange(self.num_nodes), np.diff(self.offsets))
+        return int(np.count_nonzero(src <= self.neighbors))
+
+    def edge_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the unique undirected edges as ``(u, v, weight)`` with ``u <= v``.
+        """
+        src = np.repeat(np.arange(self.num_nodes), np.diff(self.offsets))
+        mask = src <= self.neighbors
+        return src[mask], self.neighbors[mask].astype(np.int64), self.weights[mask]
+
+    def subgraph(
+        self, keep: np.ndarray, u: np.ndarray, v: np.ndarray, w: np.ndarray
+    ) -> "CSRGraph":
+        """
+        Build the graph of the nodes where ``keep`` is set, restricted to the
+        given unique edges, without decoding node or port labels.
+        """
+        index = np.cumsum(keep) - 1
+        edges = keep[u] & keep[v]
+        num_nodes = int(np.count_nonzero(keep))
+        offsets, neighbors, weights = _symmetric_csr(
+            num_nodes, index[u[edges]], index[v[edges]], w[edges]
+        )
+        port_counts = np.diff(self.port_offsets)
+        port_offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(port_counts[keep], out=port_offsets[1:])
+        port_owner = np.repeat(np.arange(self.num_nodes), port_counts)
+        return CSRGraph(
+            nodes=self.nodes[keep],
+            offsets=offsets,
+            neighbors=neighbors,
+            weights=weights,
+            port_table=self.port_table,
+            port_offsets=port_offsets,
+            port_ids=self.port_ids[keep[port_owner]],
+        )
+
+    def adjacency(self) -> sp.csr_matrix:
+        """
+        Wrap the CSR arrays as a weighted scipy adjacency matrix.
+        """
+        return sp.csr_matrix(
+            (np.asarray(self.weights, dtype=np.float64), self.neighbors, self.offsets),
+            shape=(self.num_nodes, self.num_nodes),
+        )
+
+    def node_labels(self) -> List[str]:
+        """
+        Decode the interned node table to Python strings.
+        """
+        return [node.decode("utf-8") for node in self.nodes.tolist()]
+
+    def node_ports(self) -> List[Set[str]]:
+        """
+        Decode the per-node port sets.
+        """
+        table = [port.decode("utf-8") for port in self.port_table.tolist()]
+        ids = self.port_ids.tolist()
+        bounds = self.port_offsets.tolist()
+        return [
+            {table[i] for i in ids[start:end]}
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+
+    def to_networkx(self, weighted: bool = True) -> nx.Graph:
+        """
+        Build a NetworkX graph from the CSR arrays.
+        """
+        labels = self.node_labels()
+        src = np.repeat(np.arange(self.num_nodes), np.diff(self.offsets))
+        mask = src <= self.neighbors
+        G = nx.Graph()
+        G.add_nodes_from(
+            (label, {"ports": ports}) for label, ports in zip(labels, self.node_ports())
+        )
+        if weighted:
+            G.add_weighted_edges_from(
+                (labels[u], labels[v], w)
+                for u, v, w in zip(
+                    src[mask].tolist(),
+                    self.neighbors[mask].tolist(),
+                    self.weights[mask].tolist(),
+                )
+            )
+        else:
+            G.add_edges_from(
+                (labels[u], labels[v])
+                for u, v in zip(src[mask].tolist(), self.neighbors[mask].tolist())
+            )
+        return G
+
+    @classmethod
+    def from_edge_arrays(
+        cls,
+        nodes: List[str],
+        u: np.ndarray,
+        v: np.ndarray,
+        w: np.ndarray,
+        ports: Optional[List[Set[str]]] = None,
+    ) -> "CSRGraph":
+        """
+        Build a CSR graph from unique undirected edges given as index arrays.
+        """
+        port_arrays = {}
+        if ports is not None:
+            port_index: Dict[str, int] = {}
+            port_ids = [
+                port_index.setdefault(port, len(port_index))
+                for node_ports in ports
+                for port in sorted(node_ports)
+            ]
+            port_offsets = np.zeros(len(nodes) + 1, dtype=np.int64)
+            np.cumsum([len(node_ports) for node_ports in ports], out=port_offsets[1:])
+            port_arrays = {
+                "port_table": np.array(
+                    [port.encode("utf-8") for port in port_index], dtype=np.bytes_
+                ),
+                "port_offsets": port_offsets,
+                "port_ids": np.array(port_ids, dtype=np.int32),
+            }
+
+        offsets, neighbors, weights = _symmetric_csr(len(nodes), u, v, w)
+        return cls(
+            nodes=np.array([node.encode("utf-8") for node in nodes], dtype=np.bytes_),
+            offsets=offsets,
+            neighbors=neighbors,
+            weights=weights,
+            **port_arrays,
+        )
+
+    @classmethod
+    def from_networkx(cls, G: nx.Graph, weight: str = "weight") -> "CSRGraph":
+        """
+        Build a CSR graph from a NetworkX graph, keeping its node order and the
+        ``ports`` node attribute.
+        """
+        index = {node: idx for idx, node in enumerate(G)}
+        edges = np.array(
+            [(index[u], index[v], w) for u, v, w in G.edges(data=weight, default=1)],
+            dtype=np.int64,
+        ).reshape(-1, 3)
+        ports = [ports or set() for _, ports in G.nodes(data="ports")]
+        return cls.from_edge_arrays(
+            [str(node) for node in index],
+            edges[:, 0],
+            edges[:, 1],
+            edges[:, 2],
+            ports=ports,
+        )
+
+    @classmethod
+    def from_aggregate(cls, aggregate: EdgeAggregate) -> "CSRGraph":
+        return cls.from_edge_arrays(
+            aggregate.nodes,
+            aggregate.u,
+            aggregate.v,
+            aggregate.weights,
+            aggregate.ports,
+        )
+
+
+def snapshot_path(edges_file: str) -> str:
+    """
+    Place the snapshot of a file, directory or glob spec next to its source.
+    """
+    return re.sub(r"[*?\[\]]", "_", edges_file.rstrip(os.sep)) + SNAPSHOT_SUFFIX
+
+
+def _source_signature(edges_file: str) -> Dict[str, float]:
+    num_files, size, mtime_ns = dataset_stat(edges_file)
+    return {
+        "source_files": num_files,
+        "source_size": size,
+        "source_mtime_ns": mtime_ns,
+    }
+
+
+def read_dataset(edges_file: str) -> EdgeAggregate:
+    """
+    Aggregate the edges of a dataset spec, parsing multiple files in parallel.
+    """
+    return read_weighted_edges_from_files(resolve_dataset_files(edges_file))
+
+
+def write_snapshot(edges_file: str, output: Optional[str] = None) -> str:
+    """
+    Convert a gzip edge file, directory or glob into an on-disk CSR snapshot.
+    """
+    output = output or snapshot_path(edges_file)
+    csr = CSRGraph.from_aggregate(read_dataset(edges_file))
+    os.makedirs(output, exist_ok=True)
+    meta_file = os.path.join(output, "meta.json")
+    if os.path.exists(meta_file):
+        os.remove(meta_file)
+    for name in CSR_ARRAYS:
+        np.save(os.path.join(output, f"{name}.npy"), getattr(csr, name))
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "num_nodes": csr.num_nodes,
+        "num_edges": csr.num_edges,
+        **_source_signature(edges_file),
+    }
+    # The metadata is written last so a partially written snapshot is never valid.
+    with open(meta_file, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return output
+
+
+def read_snapshot_meta(path: str) -> Optional[Dict[str, float]]:
+    try:
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def has_fresh_snapshot(edges_file: str) -> bool:
+    """
+    Check that a snapshot exists and was built from the current edge file.
+    """
+    meta = read_snapshot_meta(snapshot_path(edges_file))
+    if meta is None or meta.get("version") != SNAPSHOT_VERSION:
+        return False
+    try:
+        signature = _source_signature(edges_file)
+    except OSError:
+        return False
+    return all(meta.get(key) == value for key, value in signature.items())
+
+
+def load_snapshot(path: str) -> CSRGraph:
+    """
+    Memory-map the arrays of a snapshot directory without copying them.
+    """
+    arrays = {
+        name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+        for name in CSR_ARRAYS
+    }
+    return CSRGraph(**arrays)
+
+
+def load_csr(edges_file: str) -> CSRGraph:
+    """
+    Load the CSR arrays of a dataset without building a NetworkX graph.
+    """
+    with stage("load_graph") as info:
+        if has_fresh_snapshot(edges_file):
+            info["source"] = "snapshot"
+            csr = load_snapshot(snapshot_path(edges_file))
+        else:
+            info["source"] = "parse"
+            csr = CSRGraph.from_aggregate(read_dataset(edges_file))
+        info["nodes"] = csr.num_nodes
+    return csr
+
+
+def load_graph(edges_file: str) -> nx.Graph:
+    """
+    Load a dataset as a NetworkX graph built from its CSR arrays.
+
+    Snapshot and parse both go through ``CSRGraph.to_networkx``, so the graph
+    has the same node and edge order either way and seeded detectors give the
+    same result whether or not a snapshot was written.
+    """
+    csr = load_csr(edges_file)
+    with stage("to_networkx", nodes=csr.num_nodes):
+        return csr.to_networkx()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Convert edge files into memory-mappable CSR snapshots."
+    )
+    parser.add_argument(
+        "files",
+        nargs="*",
+        help="Edge files, directories or globs to convert (defaults to every known dataset).",
+    )
+    args = parser.parse_args()
+    files = args.files or sorted(
+        {path_selecter(file_size=size) for size in FileSize if size != FileSize.TEST}
+    )
+    for edges_file in files:
+        print(f"{edges_file} -> {write_snapshot(edges_file)}")
+
+
+if __name__ == "__main__":
+    main()
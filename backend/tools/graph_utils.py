@@ -1,11 +1,60 @@
 import gzip
+import multiprocessing
+import os
+import threading
+from collections import Counter
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict
+from typing import Hashable
 from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Set
 from typing import Tuple
+from typing import TYPE_CHECKING
 from typing import Union
 
 import networkx as nx
-import plotly.graph_objects as go
+import numpy as np
+
+from backend.tools.instrumentation import stage
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+READ_BLOCK_SIZE = 16 * 1024 * 1024
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", os.cpu_count() or 1))
+
+MAX_VIZ_EDGES = int(os.environ.get("VIZ_MAX_EDGES", 20000))
+LAYOUT_CACHE_SIZE = 8
+COORD_DECIMALS = 4
+PLOTLYJS_MODES = ("cdn", "directory", "require")
+
+
+def _plotlyjs_source(value: str) -> Union[bool, str]:
+    """
+    Parse ``VIZ_PLOTLYJS`` into an ``include_plotlyjs`` argument of plotly:
+    ``true``/``false``, one of ``PLOTLYJS_MODES`` or the path of a ``.js`` file.
+    """
+    lowered = value.strip().lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    if lowered in PLOTLYJS_MODES:
+        return lowered
+    if lowered.endswith(".js"):
+        return value.strip()
+    raise ValueError(
+        f"VIZ_PLOTLYJS must be true, false, {', '.join(PLOTLYJS_MODES)} or a "
+        f".js path, got {value!r}."
+    )
+
+
+# "cdn" keeps the multi-megabyte plotly.js bundle out of every response.
+PLOTLYJS_SOURCE = _plotlyjs_source(os.environ.get("VIZ_PLOTLYJS", "cdn"))
+
+_layout_cache: "OrderedDict[Hashable, Tuple[List, np.ndarray]]" = OrderedDict()
+_layout_lock = threading.Lock()
 
 
 def read_edges_with_ports_to_graph(edges_file: str) -> nx.Graph:
@@ -25,44 +74,298 @@ def read_edges_with_ports_to_graph(edges_file: str) -> nx.Graph:
     return G
 
 
+class EdgeAggregate:
+    """
+    Weighted edge list aggregated from an edge file in a single pass.
+
+    Attributes:
+        nodes (List[str]): Interned node IDs, indexed by node.
+        u (np.ndarray): First endpoint of each unique undirected pair.
+        v (np.ndarray): Second endpoint of each unique undirected pair.
+        weights (np.ndarray): Number of flows observed for each pair.
+        ports (List[Set[str]]): Port tokens seen on any flow touching each node.
+        num_lines (int): Number of edge lines read.
+    """
+
+    def __init__(
+        self,
+        nodes: List[str],
+        u: np.ndarray,
+        v: np.ndarray,
+        weights: np.ndarray,
+        ports: List[Set[str]],
+        num_lines: int,
+    ):
+        self.nodes = nodes
+        self.u = u
+        self.v = v
+        self.weights = weights
+        self.ports = ports
+        self.num_lines = num_lines
+
+    def to_networkx(self) -> nx.Graph:
+        """
+        Build a weighted NetworkX graph with a ``ports`` attribute on each node.
+        """
+        G = nx.Graph()
+        G.add_nodes_from(
+            (node, {"ports": ports}) for node, ports in zip(self.nodes, self.ports)
+        )
+        nodes = self.nodes
+        G.add_weighted_edges_from(
+            (nodes[a], nodes[b], w)
+            for a, b, w in zip(self.u.tolist(), self.v.tolist(), self.weights.tolist())
+        )
+        return G
+
+
+def read_weighted_edges(edges_file: str) -> EdgeAggregate:
+    """
+    Read an edge file in large blocks, aggregating flow counts per node pair and
+    the port tokens seen per node.
+    """
+    index: Dict[bytes, int] = {}
+    node_ports: List[Set[bytes]] = []
+    pair_counts: Dict[int, int] = {}
+    num_lines = 0
+
+    def consume(lines: List[bytes]) -> None:
+        nonlocal num_lines
+        # Flows between the same hosts on the same ports repeat many times, so
+        # lines are first counted by their content after the timestamp and each
+        # distinct tail is interned only once. Blank and whitespace-only lines,
+        # CRLF ones included, split into fewer than two fields and are skipped.
+        tails = Counter(
+            fields[1]
+            for fields in (line.split(None, 1) for line in lines if line[:1] != b"#")
+            if len(fields) == 2
+        )
+        for tail, count in tails.items():
+            parts = tail.split(None, 2)
+            if len(parts) < 2:
+                continue
+            num_lines += count
+            u = index.get(parts[0])
+            if u is None:
+                u = index[parts[0]] = len(index)
+                node_ports.append(set())
+            v = index.get(parts[1])
+            if v is None:
+                v = index[parts[1]] = len(index)
+                node_ports.append(set())
+            key = (u << 32) | v if u <= v else (v << 32) | u
+            pair_counts[key] = pair_counts.get(key, 0) + count
+            if len(parts) > 2:
+                node_ports[u].add(parts[2])
+                node_ports[v].add(parts[2])
+
+    with gzip.open(edges_file, mode="rb") as fopen:
+        remainder = b""
+        while True:
+            block = fopen.read(READ_BLOCK_SIZE)
+            if not block:
+                break
+            lines = (remainder + block).split(b"\n")
+            remainder = lines.pop()
+            consume(lines)
+        consume([remainder])
+
+    keys = np.fromiter(pair_counts.keys(), dtype=np.int64, count=len(pair_counts))
+    return EdgeAggregate(
+        nodes=[node.decode("utf-8") for node in index],
+        u=keys >> 32,
+        v=keys & 0xFFFFFFFF,
+        weights=np.fromiter(
+            pair_counts.values(), dtype=np.int64, count=len(pair_counts)
+        ),
+        ports=[
+            {port.decode("utf-8") for raw in raw_ports for port in raw.split()}
+            for raw_ports in node_ports
+        ],
+        num_lines=num_lines,
+    )
+
+
+def merge_edge_aggregates(parts: Sequence[EdgeAggregate]) -> EdgeAggregate:
+    """
+    Merge per-file aggregates into one, interning node IDs across all parts.
+    """
+    if len(parts) == 1:
+        return parts[0]
+    index: Dict[str, int] = {}
+    ports: List[Set[str]] = []
+    keys, weights = [], []
+    for part in parts:
+        remap = np.fromiter(
+            (index.setdefault(node, len(index)) for node in part.nodes),
+            dtype=np.int64,
+            count=len(part.nodes),
+        )
+        ports.extend(set() for _ in range(len(index) - len(ports)))
+        for idx, node_ports in zip(remap.tolist(), part.ports):
+            ports[idx] |= node_ports
+        u, v = remap[part.u], remap[part.v]
+        keys.append((np.minimum(u, v) << 32) | np.maximum(u, v))
+        weights.append(part.weights)
+
+    unique, inverse = np.unique(np.concatenate(keys), return_inverse=True)
+    return EdgeAggregate(
+        nodes=list(index),
+        u=unique >> 32,
+        v=unique & 0xFFFFFFFF,
+        weights=np.bincount(inverse, weights=np.concatenate(weights)).astype(np.int64),
+        ports=ports,
+        num_lines=sum(part.num_lines for part in parts),
+    )
+
+
+def read_weighted_edges_from_files(
+    edges_files: Sequence[str], workers: int = INGEST_WORKERS
+) -> EdgeAggregate:
+    """
+    Read several edge files, one per worker process, and merge their aggregates.
+
+    Each worker decompresses and aggregates whole files, so ingest time scales
+    with the number of workers rather than the number of files.
+    """
+    workers = min(workers, len(edges_files))
+    # Daemonic processes may not start children; read serially there.
+    if workers <= 1 or multiprocessing.current_process().daemon:
+        parts = [read_weighted_edges(edges_file) for edges_file in edges_files]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            parts = list(executor.map(read_weighted_edges, edges_files))
+    return merge_edge_aggregates(parts)
+
+
+def read_weighted_edges_to_graph(edges_file: str) -> nx.Graph:
+    """
+    Read edges from a file into a graph weighted by flow count, with port sets.
+    """
+    return read_weighted_edges(edges_file).to_networkx()
+
+
+def node_label_array(
+    nodes: List, partition: Union[Dict[str, int], Sequence[Sequence[str]]]
+) -> np.ndarray:
+    """
+    Map a partition onto an integer label array aligned with ``nodes``.
+
+    Nodes missing from the partition get the label -1.
+    """
+    if isinstance(partition, dict):
+        lookup = partition
+    else:
+        lookup = {
+            node: idx for idx, community in enumerate(partition) for node in community
+        }
+    return np.fromiter(
+        (lookup.get(node, -1) for node in nodes), dtype=np.int64, count=len(nodes)
+    )
+
+
+def compute_layout(
+    G: nx.Graph,
+    layout_key: Optional[Hashable] = None,
+    seed: int = 42,
+    weight: Optional[str] = None,
+) -> Tuple[List, np.ndarray]:
+    """
+    Compute node positions, reusing a cached layout for the same key.
+
+    Returns the node order and an (N, 2) array of coordinates in that order.
+    """
+    with stage("layout", nodes=G.number_of_nodes()) as info:
+        if layout_key is not None:
+            with _layout_lock:
+                cached = _layout_cache.get(layout_key)
+                if cached is not None and len(cached[0]) == G.number_of_nodes():
+                    _layout_cache.move_to_end(layout_key)
+                    info["cached"] = 1
+                    return cached
+
+        nodes = list(G.nodes())
+        pos = nx.spring_layout(G, seed=seed, weight=weight)
+        coords = np.array([pos[node] for node in nodes], dtype=np.float64).reshape(
+            -1, 2
+        )
+        layout = (nodes, coords)
+
+        if layout_key is not None:
+            with _layout_lock:
+                _layout_cache[layout_key] = layout
+                while len(_layout_cache) > LAYOUT_CACHE_SIZE:
+                    _layout_cache.popitem(last=False)
+        info["cached"] = 0
+        return layout
+
+
+def _render_html(fig: "go.Figure") -> str:
+    with stage("render") as info:
+        html = fig.to_html(full_html=False, include_plotlyjs=PLOTLYJS_SOURCE)
+        info["bytes"] = len(html)
+    return html
+
+
 def create_html_visualization(
     G: nx.Graph,
-    partition: Union[Dict[str, int], Tuple[List[str], ...]],
+    partition: Union[Dict[str, int], Sequence[Sequence[str]]],
     title: str = "Network Visualization",
+    layout_key: Optional[Hashable] = None,
+    max_edges: int = MAX_VIZ_EDGES,
+    seed: int = 42,
 ) -> str:
     """
     Create an HTML visualization of a NetworkX graph using Plotly.
+
+    Coordinates are built as arrays in one pass and drawn with WebGL traces.
+    Layouts are cached per ``layout_key``, and above ``max_edges`` a seeded
+    uniform sample of the edges is drawn to bound the payload.
     """
-    # Determine positions for nodes
-    pos = nx.spring_layout(G)
+    import plotly.graph_objects as go
 
-    # Create edge traces
-    edge_trace = go.Scatter(
-        x=[],
-        y=[],
+    nodes, coords = compute_layout(G, layout_key=layout_key, seed=seed)
+    coords = np.round(coords, COORD_DECIMALS)
+    index = {node: idx for idx, node in enumerate(nodes)}
+
+    edges = np.array(
+        [(index[u], index[v]) for u, v in G.edges()], dtype=np.int64
+    ).reshape(-1, 2)
+    if len(edges) > max_edges:
+        rng = np.random.default_rng(seed)
+        edges = edges[np.sort(rng.choice(len(edges), size=max_edges, replace=False))]
+
+    # Each edge is drawn as (start, end, gap); NaN gaps become nulls in the JSON.
+    edge_x = np.full(3 * len(edges), np.nan)
+    edge_y = np.full(3 * len(edges), np.nan)
+    edge_x[0::3], edge_x[1::3] = coords[edges[:, 0], 0], coords[edges[:, 1], 0]
+    edge_y[0::3], edge_y[1::3] = coords[edges[:, 0], 1], coords[edges[:, 1], 1]
+
+    edge_trace = go.Scattergl(
+        x=edge_x,
+        y=edge_y,
         line=dict(width=0.5, color="#888"),
         hoverinfo="none",
         mode="lines",
     )
 
-    for edge in G.edges():
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        edge_trace["x"] += (x0, x1, None)
-        edge_trace["y"] += (y0, y1, None)
-
-    # Create node traces with color for communities
-    node_trace = go.Scatter(
-        x=[],
-        y=[],
-        text=[],
+    labels = node_label_array(nodes, partition)
+    node_trace = go.Scattergl(
+        x=coords[:, 0],
+        y=coords[:, 1],
+        text=[
+            f"Node {node}<br>Community {label}"
+            for node, label in zip(nodes, labels.tolist())
+        ],
         mode="markers",
         hoverinfo="text",
         marker=dict(
             showscale=True,
             colorscale="Viridis",
-            color=[],
-            size=10,
+            color=labels,
+            size=10 if len(nodes) < 5000 else 4,
             colorbar=dict(
                 thickness=15,
                 title="Community",
@@ -72,30 +375,6 @@ def create_html_visualization(
         ),
     )
 
-    if isinstance(partition, dict):  # For algorithms like Louvain and Label Propagation
-        for node in G.nodes():
-            x, y = pos[node]
-            node_trace["x"] += (x,)
-            node_trace["y"] += (y,)
-            # Color nodes by community
-            node_trace["marker"]["color"] += (partition[node],)
-            node_trace["text"] += (f"Node {node}<br>Community {partition[node]}",)
-    else:  # For algorithms like Girvan-Newman
-        node_to_community = {}
-        for idx, community in enumerate(partition):
-            for node in community:
-                node_to_community[node] = idx
-
-        for node in G.nodes():
-            x, y = pos[node]
-            node_trace["x"] += (x,)
-            node_trace["y"] += (y,)
-            # Color nodes by community
-            node_trace["marker"]["color"] += (node_to_community[node],)
-            node_trace["text"] += (
-                f"Node {node}<br>Community {node_to_community[node]}",
-            )
-
     # Build the figure
     fig = go.Figure(
         data=[edge_trace, node_trace],
@@ -110,5 +389,116 @@ def create_html_visualization(
         ),
     )
 
-    # Return the figure as an HTML string
-    return fig.to_html(full_html=False)
+    return _render_html(fig)
+
+
+def create_community_graph_visualization(
+    G: nx.Graph,
+    partition: Union[Dict[str, int], Sequence[Sequence[str]]],
+    title: str = "Community Overview",
+    layout_key: Optional[Hashable] = None,
+    max_edges: int = MAX_VIZ_EDGES,
+    seed: int = 42,
+) -> str:
+    """
+    Create an HTML view of the graph with each community collapsed to one node.
+
+    Super-nodes are sized by member count and super-edges merge all edges
+    between two communities, so layout time and payload depend on the number
+    of communities rather than on the number of nodes.
+    """
+    import plotly.graph_objects as go
+
+    nodes = list(G.nodes())
+    labels = node_label_array(nodes, partition)
+    community_ids, compact = np.unique(labels, return_inverse=True)
+    sizes = np.bincount(compact)
+    index = {node: idx for idx, node in enumerate(nodes)}
+
+    edge_data = [
+        (index[u], index[v], w) for u, v, w in G.edges(data="weight", default=1)
+    ]
+    edges = np.array([(u, v) for u, v, _ in edge_data], dtype=np.int64).reshape(-1, 2)
+    weights = np.array([w for _, _, w in edge_data], dtype=np.float64)
+    a, b = compact[edges[:, 0]], compact[edges[:, 1]]
+    internal = np.bincount(a[a == b], weights=weights[a == b], minlength=len(sizes))
+    lo, hi = np.minimum(a, b)[a != b], np.maximum(a, b)[a != b]
+    pair_keys, inverse = np.unique(lo * len(sizes) + hi, return_inverse=True)
+    pair_weights = np.bincount(inverse, weights=weights[a != b])
+    if len(pair_keys) > max_edges:
+        keep = np.sort(np.argsort(-pair_weights, kind="stable")[:max_edges])
+        pair_keys, pair_weights = pair_keys[keep], pair_weights[keep]
+    src, dst = pair_keys // len(sizes), pair_keys % len(sizes)
+
+    super_graph = nx.Graph()
+    super_graph.add_nodes_from(range(len(sizes)))
+    super_graph.add_weighted_edges_from(
+        zip(src.tolist(), dst.tolist(), pair_weights.tolist())
+    )
+    _, coords = compute_layout(
+        super_graph, layout_key=layout_key, seed=seed, weight="weight"
+    )
+    coords = np.round(coords, COORD_DECIMALS)
+
+    # Plotly WebGL lines share one width per trace, so super-edges are drawn
+    # in a few weight buckets.
+    edge_traces = []
+    if len(pair_weights):
+        buckets = np.quantile(pair_weights, [0.5, 0.9, 0.99])
+        bucket_of = np.searchsorted(buckets, pair_weights, side="right")
+        for bucket in range(len(buckets) + 1):
+            mask = bucket_of == bucket
+            if not mask.any():
+                continue
+            edge_x = np.full(3 * int(mask.sum()), np.nan)
+            edge_y = np.full(3 * int(mask.sum()), np.nan)
+            edge_x[0::3], edge_x[1::3] = coords[src[mask], 0], coords[dst[mask], 0]
+            edge_y[0::3], edge_y[1::3] = coords[src[mask], 1], coords[dst[mask], 1]
+            edge_traces.append(
+                go.Scattergl(
+                    x=edge_x,
+                    y=edge_y,
+                    line=dict(width=0.5 + 1.5 * bucket, color="#888"),
+                    hoverinfo="none",
+                    mode="lines",
+                )
+            )
+
+    node_trace = go.Scattergl(
+        x=coords[:, 0],
+        y=coords[:, 1],
+        text=[
+            f"Community {community}<br>{size} nodes<br>Internal weight {weight:g}"
+            for community, size, weight in zip(
+                community_ids.tolist(), sizes.tolist(), internal.tolist()
+            )
+        ],
+        mode="markers",
+        hoverinfo="text",
+        marker=dict(
+            showscale=True,
+            colorscale="Viridis",
+            color=community_ids,
+            size=np.clip(4 + 2 * np.sqrt(sizes), 4, 60),
+            colorbar=dict(
+                thickness=15,
+                title="Community",
+                xanchor="left",
+                titleside="right",
+            ),
+        ),
+    )
+
+    fig = go.Figure(
+        data=[*edge_traces, node_trace],
+        layout=go.Layout(
+            title=title,
+            titlefont_size=16,
+            showlegend=False,
+            hovermode="closest",
+            margin=dict(l=0, r=0, b=0, t=40),
+            xaxis=dict(showgrid=False, zeroline=False),
+            yaxis=dict(showgrid=False, zeroline=False),
+        ),
+    )
+    return _render_html(fig)
@@ -0,0 +1,193 @@
+import random
+from collections import Counter
+from typing import Dict
+from typing import Hashable
+from typing import Optional
+from typing import Tuple
+
+import networkx as nx
+
+DEFAULT_MAX_SWEEPS = 10
+DEFAULT_MAX_ITERATIONS = 100
+
+Labels = Dict[Hashable, int]
+
+
+def _initial_labels(G: nx.Graph, previous: Optional[Labels]) -> Labels:
+    """
+    Start from the previous labels; nodes new to this window get singletons.
+    """
+    previous = previous or {}
+    next_label = max(previous.values(), default=-1) + 1
+    labels: Labels = {}
+    for node in G:
+        label = previous.get(node)
+        if label is None:
+            label = next_label
+            next_label += 1
+        labels[node] = label
+    return labels
+
+
+def align_labels(
+    partition: Labels, previous: Optional[Labels], next_label: int
+) -> Tuple[Labels, int]:
+    """
+    Renumber communities so they keep the label of their predecessor.
+
+    Communities are matched largest first to the previous label most of their
+    members carried; unmatched communities get fresh labels from
+    ``next_label``. Returns the aligned partition and the next free label.
+    """
+    previous = previous or {}
+    members: Dict[int, list] = {}
+    for node, label in partition.items():
+        members.setdefault(label, []).append(node)
+
+    used = set()
+    mapping: Dict[int, int] = {}
+    for label, nodes in sorted(members.items(), key=lambda item: -len(item[1])):
+        overlap = Counter(
+            previous[node] for node in nodes if node in previous
+        ).most_common()
+        match = next((old for old, _ in overlap if old not in used), None)
+        if match is None:
+            match = next_label
+            next_label += 1
+        used.add(match)
+        mapping[label] = match
+    return {node: mapping[label] for node, label in partition.items()}, next_label
+
+
+def warm_start_label_propagation(
+    G: nx.Graph,
+    previous: Optional[Labels] = None,
+    seed: Optional[int] = None,
+    weight: str = "weight",
+    max_iterations: int = DEFAULT_MAX_ITERATIONS,
+) -> Labels:
+    """
+    Asynchronous weighted label propagation started from a previous partition.
+
+    Each node adopts the label with the largest total edge weight among its
+    neighbours, keeping its own label on ties, until no label changes.
+    """
+    rng = random.Random(seed)
+    labels = _initial_labels(G, previous)
+    nodes = list(G)
+    for _ in range(max_iterations):
+        rng.shuffle(nodes)
+        changed = False
+        for node in nodes:
+            scores: Dict[int, float] = {}
+            for neighbor, data in G.adj[node].items():
+                if neighbor != node:
+                    label = labels[neighbor]
+                    scores[label] = scores.get(label, 0.0) + data.get(weight, 1)
+            if not scores:
+                continue
+            best = max(scores.values())
+            if scores.get(labels[node]) == best:
+                continue
+            candidates = [label for label, score in scores.items() if score == best]
+            labels[node] = rng.choice(candidates)
+            changed = True
+        if not changed:
+            break
+    return labels
+
+
+def _local_moving(
+    G: nx.Graph,
+    labels: Labels,
+    rng: random.Random,
+    weight: str,
+    resolution: float,
+    max_sweeps: int,
+) -> Labels:
+    """
+    Louvain's first phase: move nodes to the neighbouring community with the
+    best modularity gain until no move improves it.
+    """
+    total = G.size(weight=weight)
+    if total == 0:
+        return labels
+    degrees = dict(G.degree(weight=weight))
+    community_degree: Dict[int, float] = {}
+    for node, label in labels.items():
+        community_degree[label] = community_degree.get(label, 0.0) + degrees[node]
+
+    nodes = list(G)
+    for _ in range(max_sweeps):
+        rng.shuffle(nodes)
+        moved = False
+        for node in nodes:
+            current = labels[node]
+            degree = degrees[node]
+            links: Dict[int, float] = {}
+            for neighbor, data in G.adj[node].items():
+                if neighbor != node:
+                    label = labels[neighbor]
+                    links[label] = links.get(label, 0.0) + data.get(weight, 1)
+            community_degree[current] -= degree
+            best, best_gain = current, links.get(current, 0.0) - (
+                resolution * community_degree[current] * degree / (2 * total)
+            )
+            for label, link in links.items():
+                gain = link - resolution * community_degree[label] * degree / (
+                    2 * total
+                )
+                if gain > best_gain:
+                    best, best_gain = label, gain
+            community_degree[best] += degree
+            if best != current:
+                labels[node] = best
+                moved = True
+        if not moved:
+            break
+    return labels
+
+
+def warm_start_louvain(
+    G: nx.Graph,
+    previous: Optional[Labels] = None,
+    seed: Optional[int] = None,
+    weight: str = "weight",
+    resolution: float = 1.0,
+    max_sweeps: int = DEFAULT_MAX_SWEEPS,
+) -> Labels:
+    """
+    Louvain started from a previous partition.
+
+    Nodes first move locally from their previous communities, then the
+    communities are aggregated and Louvain runs on the much smaller
+    community graph. Without a previous partition this is plain Louvain.
+    """
+    if not previous:
+        communities = nx.community.louvain_communities(
+            G, weight=weight, resolution=resolution, seed=seed
+        )
+        return {
+            node: label for label, members in enumerate(communities) for node in members
+        }
+
+    rng = random.Random(seed)
+    labels = _local_moving(
+        G, _initial_labels(G, previous), rng, weight, resolution, max_sweeps
+    )
+
+    aggregated = nx.Graph()
+    aggregated.add_nodes_from(set(labels.values()))
+    for u, v, w in G.edges(data=weight, default=1):
+        a, b = labels[u], labels[v]
+        if aggregated.has_edge(a, b):
+            aggregated[a][b][weight] += w
+        else:
+            aggregated.add_edge(a, b, **{weight: w})
+    merged = nx.community.louvain_communities(
+        aggregated, weight=weight, resolution=resolution, seed=seed
+    )
+    community_of = {
+        label: idx for idx, members in enumerate(merged) for label in members
+    }
+    return {node: community_of[label] for node, label in labels.items()}
@@ -0,0 +1,324 @@
+import cProfile
+import io
+import marshal
+import math
+import pstats
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
+MAX_PROFILES = 32
+
+LabelValues = Tuple[str, ...]
+
+
+class Histogram:
+    """
+    Prometheus histogram with a fixed set of labels.
+
+    Attributes:
+        name (str): Metric name.
+        documentation (str): Help text exported with the metric.
+        label_names (Tuple[str, ...]): Names of the labels, in export order.
+        buckets (Tuple[float, ...]): Upper bounds of the buckets, without +Inf.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            counts, total = self._series.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[idx] += 1
+                    break
+            else:
+                counts[-1] += 1
+            total[0] += value
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = sorted(
+                (key, list(counts), total[0])
+                for key, (counts, total) in self._series.items()
+            )
+        for key, counts, total in series:
+            pairs = [
+                f'{name}="{_escape(value)}"'
+                for name, value in zip(self.label_names, key)
+            ]
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else repr(bound)
+                labels = ",".join(pairs + [f'le="{le}"'])
+                lines.append(f"{self.name}_bucket{{{labels}}} {cumulative}")
+            labels = "{" + ",".join(pairs) + "}" if pairs else ""
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+REQUEST_SECONDS = Histogram(
+    "cisco_request_duration_seconds",
+    "Latency of instrumented requests.",
+    ("route", "algorithm", "dataset"),
+)
+STAGE_SECONDS = Histogram(
+    "cisco_stage_duration_seconds",
+    "Duration of instrumented processing stages.",
+    ("stage", "algorithm", "dataset"),
+)
+_METRICS = (REQUEST_SECONDS, STAGE_SECONDS)
+
+
+def render_metrics() -> str:
+    """
+    Export every metric in the Prometheus text exposition format.
+    """
+    lines: List[str] = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class Timings:
+    """
+    Stages recorded while serving one request.
+
+    Attributes:
+        stages (List[Dict[str, Any]]): Finished stages with their name,
+            duration in seconds and size attributes, in completion order.
+        labels (Dict[str, str]): Labels such as algorithm and dataset that the
+            request's metrics are reported under.
+        profile (bool): Whether the outermost stage should be profiled.
+        profile_id (Optional[str]): ID of the stored profile, once taken.
+        headers (Dict[str, str]): Extra headers to add to the response.
+    """
+
+    def __init__(self, profile: bool = False):
+        self.stages: List[Dict[str, Any]] = []
+        self.labels: Dict[str, str] = {}
+        self.headers: Dict[str, str] = {}
+        self.profile = profile
+        self.profile_id: Optional[str] = None
+        self._profiler: Optional[cProfile.Profile] = None
+
+    def server_timing(self) -> str:
+        """
+        Format the stages as a ``Server-Timing`` header value.
+        """
+        entries = []
+        for idx, entry in enumerate(self.stages):
+            sizes = " ".join(
+                f"{key}={value}"
+                for key, value in entry.items()
+                if key not in ("name", "seconds")
+            )
+            metric = f"{idx}-{entry['name']};dur={entry['seconds'] * 1000:.2f}"
+            if sizes:
+                metric += f';desc="{sizes}"'
+            entries.append(metric)
+        return ", ".join(entries)
+
+
+_current_timings: ContextVar[Optional[Timings]] = ContextVar(
+    "current_timings", default=None
+)
+
+
+def start_timings(profile: bool = False) -> Timings:
+    """
+    Start collecting stages for the current request context.
+    """
+    timings = Timings(profile=profile)
+    _current_timings.set(timings)
+    return timings
+
+
+def current_timings() -> Optional[Timings]:
+    return _current_timings.get()
+
+
+def set_labels(**labels: Any) -> None:
+    """
+    Attach metric labels to the current request, if it is instrumented.
+    """
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.labels.update({key: str(value) for key, value in labels.items()})
+
+
+def add_response_headers(headers: Dict[str, str]) -> None:
+    """
+    Ask the middleware to add headers to the current response, if instrumented.
+    """
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.headers.update(headers)
+
+
+class _ProfileStore:
+    """
+    Bounded in-memory store of marshalled ``pstats`` dumps.
+    """
+
+    def __init__(self, max_entries: int = MAX_PROFILES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, profiler: cProfile.Profile) -> str:
+        profiler.create_stats()
+        profile_id = uuid.uuid4().hex
+        with self._lock:
+            self._entries[profile_id] = marshal.dumps(profiler.stats)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id: str) -> Optional[bytes]:
+        with self._lock:
+            return self._entries.get(profile_id)
+
+
+profile_store = _ProfileStore()
+
+
+class _LoadedProfile:
+    """
+    Stored profile data in the shape ``pstats.Stats`` loads from a profiler.
+    """
+
+    def __init__(self, stats: Dict):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+def format_profile(dump: bytes, sort: str = "cumulative", limit: int = 50) -> str:
+    """
+    Render a stored profile dump as a ``pstats`` report.
+    """
+    stream = io.StringIO()
+    stats = pstats.Stats(_LoadedProfile(marshal.loads(dump)), stream=stream)
+    stats.sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+def _status_bytes(field: str) -> int:
+    with open("/proc/self/status", encoding="ascii") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) * 1024
+    raise OSError(f"{field} missing from /proc/self/status")
+
+
+@contextmanager
+def peak_memory() -> Iterator[Dict[str, Optional[int]]]:
+    """
+    Measure how far resident memory rose above its level on entry while the
+    block ran, as ``peak_bytes`` in the yielded dict.
+
+    The kernel's peak-RSS mark is reset on entry, so earlier and larger runs of
+    the same process do not hide this one. The figure covers the whole
+    process: in a job or compare worker it is the run's own, in the server
+    concurrent requests add to it. It stays None where the mark cannot be
+    reset, outside Linux.
+    """
+    info: Dict[str, Optional[int]] = {"peak_bytes": None}
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+        start = _status_bytes("VmRSS")
+    except OSError:
+        start = None
+    try:
+        yield info
+    finally:
+        if start is not None:
+            try:
+                info["peak_bytes"] = max(0, _status_bytes("VmHWM") - start)
+            except OSError:
+                pass
+
+
+@contextmanager
+def stage(name: str, **sizes: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Time a processing stage of the current request.
+
+    The yielded dict can be filled with sizes (nodes, edges, bytes) while the
+    stage runs. The duration is recorded in the request's ``Timings`` and in
+    the stage histogram. When the request asked for a profile, the outermost
+    stage runs under cProfile and the dump is kept in ``profile_store``.
+    """
+    timings = _current_timings.get()
+    entry: Dict[str, Any] = dict(sizes)
+    profiler = None
+    if timings is not None and timings.profile and timings._profiler is None:
+        profiler = timings._profiler = cProfile.Profile()
+        profiler.enable()
+    start = time.perf_counter()
+    try:
+        yield entry
+    finally:
+        seconds = time.perf_counter() - start
+        if profiler is not None:
+            profiler.disable()
+            timings.profile_id = profile_store.put(profiler)
+        labels = timings.labels if timings is not None else {}
+        STAGE_SECONDS.observe(seconds, stage=name, **labels)
+        if timings is not None:
+            timings.stages.append({"name": name, "seconds": seconds, **entry})
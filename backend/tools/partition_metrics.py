@@ -0,0 +1,79 @@
+from typing import Dict
+
+import numpy as np
+import scipy.sparse as sp
+
+
+def contingency_matrix(predicted: np.ndarray, truth: np.ndarray) -> sp.csr_matrix:
+    """
+    Build the sparse contingency matrix of two integer label arrays.
+
+    Rows are predicted communities and columns ground-truth groups; labels are
+    compacted first so arbitrary non-negative IDs are allowed.
+    """
+    _, rows = np.unique(predicted, return_inverse=True)
+    _, cols = np.unique(truth, return_inverse=True)
+    data = np.ones(len(rows), dtype=np.int64)
+    matrix = sp.coo_matrix(
+        (data, (rows, cols)), shape=(rows.max(initial=-1) + 1, cols.max(initial=-1) + 1)
+    )
+    return matrix.tocsr()
+
+
+def _comb2(values: np.ndarray) -> float:
+    values = values.astype(np.float64)
+    return float(np.sum(values * (values - 1) / 2))
+
+
+def _entropy(counts: np.ndarray, total: float) -> float:
+    p = counts[counts > 0] / total
+    return float(-np.sum(p * np.log(p)))
+
+
+def partition_scores(predicted: np.ndarray, truth: np.ndarray) -> Dict[str, float]:
+    """
+    Compare a predicted labelling with ground truth on nodes labelled in both.
+
+    Labels below zero mark nodes without a label. Returns normalized mutual
+    information (arithmetic normalization), adjusted Rand index, purity and
+    coverage, the share of ground-truth nodes that received a prediction.
+    """
+    labelled_truth = truth >= 0
+    both = labelled_truth & (predicted >= 0)
+    total = int(both.sum())
+    coverage = total / int(labelled_truth.sum()) if labelled_truth.any() else 0.0
+    if total == 0:
+        return {"nmi": 0.0, "ari": 0.0, "purity": 0.0, "coverage": coverage}
+
+    matrix = contingency_matrix(predicted[both], truth[both])
+    row_sums = np.asarray(matrix.sum(axis=1)).ravel()
+    col_sums = np.asarray(matrix.sum(axis=0)).ravel()
+    nonzero = matrix.tocoo()
+
+    purity = float(matrix.max(axis=1).toarray().sum()) / total
+
+    index = _comb2(nonzero.data)
+    rows_comb, cols_comb = _comb2(row_sums), _comb2(col_sums)
+    pairs = _comb2(np.array([total]))
+    expected = rows_comb * cols_comb / pairs if pairs else 0.0
+    maximum = (rows_comb + cols_comb) / 2
+    ari = 1.0 if maximum == expected else (index - expected) / (maximum - expected)
+
+    h_pred, h_true = _entropy(row_sums, total), _entropy(col_sums, total)
+    if h_pred == 0 and h_true == 0:
+        nmi = 1.0
+    else:
+        mutual_information = float(
+            np.sum(
+                nonzero.data
+                / total
+                * np.log(
+                    nonzero.data
+                    * total
+                    / (row_sums[nonzero.row] * col_sums[nonzero.col])
+                )
+            )
+        )
+        nmi = max(0.0, mutual_information / ((h_pred + h_true) / 2))
+
+    return {"nmi": nmi, "ari": float(ari), "purity": purity, "coverage": coverage}
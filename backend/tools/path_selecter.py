@@ -1,11 +1,19 @@
+import glob
+import os
+from typing import List
+from typing import Tuple
+
 from backend.tools.custom_enums import FileSize
 
 small_2d_path = "Cisco_22_networks/dir_g21_small_workload_with_gt/dir_no_packets_etc/edges_2days_feb10thruFeb11_all_49sensors.csv.txt.gz"
 small_4d_path = "Cisco_22_networks/dir_g21_small_workload_with_gt/dir_no_packets_etc/edges_4days_feb10thruFeb13_all_49sensors.csv.txt.gz"
 small_12h_path = "Cisco_22_networks/dir_g21_small_workload_with_gt/dir_no_packets_etc/edges_12hrs_feb10_all_49sensors.csv.txt.gz"
-large_path = "Cisco_22_networks/dir_20_graphs/dir_day1/out1_1.txt.gz"
+large_path = "Cisco_22_networks/dir_20_graphs/dir_day1"
 test = "Cisco_22_networks/dir_g21_small_workload_with_gt/grouping.gt.txt"
 
+# Files picked up when a dataset spec names a directory.
+DATASET_FILE_PATTERN = "*.gz"
+
 
 rnd_small = [
     "Cisco_22_networks/dir_g21_small_workload_with_gt/dir_no_packets_etc/edges_2days_feb10thruFeb11_all_49sensors.csv.txt.gz",
@@ -26,3 +34,37 @@ def path_selecter(file_size: FileSize) -> str:
     if file_size == FileSize.TEST:
         return test
     return small_2d_path
+
+
+def resolve_dataset_files(spec: str) -> List[str]:
+    """
+    Expand a dataset spec into its edge files, in sorted order.
+
+    A spec is a single file, a directory (every ``DATASET_FILE_PATTERN`` file in
+    it) or a glob pattern.
+    """
+    if os.path.isdir(spec):
+        pattern = os.path.join(spec, DATASET_FILE_PATTERN)
+        files = sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
+    elif glob.has_magic(spec):
+        files = sorted(path for path in glob.glob(spec) if os.path.isfile(path))
+    else:
+        return [spec]
+    if not files:
+        raise FileNotFoundError(f"No edge files match dataset spec: {spec}")
+    return files
+
+
+def dataset_stat(spec: str) -> Tuple[int, int, int]:
+    """
+    Summarize the current content of a dataset spec.
+
+    Returns the number of files, their total size and their latest mtime in
+    nanoseconds, so adding, removing or rewriting any file changes the result.
+    """
+    stats = [os.stat(path) for path in resolve_dataset_files(spec)]
+    return (
+        len(stats),
+        sum(stat.st_size for stat in stats),
+        max(stat.st_mtime_ns for stat in stats),
+    )
@@ -0,0 +1,157 @@
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import normalize
+
+from backend.tools.admission import CostEstimate
+from backend.tools.admission import CostModel
+from backend.tools.admission import csr_bytes
+from backend.tools.admission import linear_cost
+from backend.tools.community_base import CommunityDetectionBase
+from backend.tools.community_base import DEFAULT_N_CLUSTERS
+from backend.tools.community_base import DEFAULT_SEED
+from backend.tools.custom_enums import FileSize
+from backend.tools.graph_snapshot import CSRGraph
+from backend.tools.reduction import GraphReduction
+from backend.tools.reduction import NO_REDUCTION
+
+# Ports seen on fewer hosts than this say nothing about groups of hosts.
+MIN_PORT_HOSTS = 2
+BATCH_SIZE = 4096
+
+
+def _parse_port_tokens(port_table: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split interned tokens such as ``6p443-3`` into the port, ``6p443``, and its
+    usage level, ``3``. Tokens without a numeric level count once.
+    """
+    names, levels = [], []
+    for token in port_table.tolist():
+        name, _, level = token.decode("utf-8").rpartition("-")
+        if name and level.isdigit():
+            names.append(name)
+            levels.append(max(int(level), 1))
+        else:
+            names.append(token.decode("utf-8"))
+            levels.append(1)
+    return np.array(names, dtype=object), np.array(levels, dtype=np.float64)
+
+
+def port_features(
+    port_table: np.ndarray,
+    port_offsets: np.ndarray,
+    port_ids: np.ndarray,
+    min_hosts: int = MIN_PORT_HOSTS,
+) -> sp.csr_matrix:
+    """
+    Build the TF-IDF matrix of port usage, one row per node and one column per
+    port, in a single pass over the per-node port tokens.
+
+    The usage levels of a node's tokens for the same port add up to its term
+    frequency, which is damped to ``1 + log(tf)``. Rows are L2-normalized, so
+    Euclidean k-means on them groups nodes by cosine similarity. The matrix
+    stays sparse throughout.
+    """
+    num_nodes = len(port_offsets) - 1
+    if len(port_table) == 0:
+        return sp.csr_matrix((num_nodes, 0))
+    names, levels = _parse_port_tokens(port_table)
+    ports, columns = np.unique(names, return_inverse=True)
+    # The per-node token slices already are the rows of a CSR matrix.
+    tf = sp.csr_matrix(
+        (levels[port_ids], columns[port_ids].astype(np.int32), port_offsets),
+        shape=(num_nodes, len(ports)),
+    )
+    tf.sum_duplicates()
+    hosts = np.bincount(tf.indices, minlength=len(ports))
+    if np.any(hosts < min_hosts):
+        tf = tf[:, hosts >= min_hosts].tocsr()
+        hosts = hosts[hosts >= min_hosts]
+
+    idf = np.log((1 + num_nodes) / (1 + hosts)) + 1
+    tf.data = (1 + np.log(tf.data)) * idf[tf.indices]
+    return normalize(tf, copy=False)
+
+
+def cluster_port_profiles(
+    features: sp.csr_matrix, n_clusters: int, seed: Optional[int] = None
+) -> np.ndarray:
+    """
+    Cluster the rows of a port feature matrix with mini-batch k-means.
+
+    Nodes without any port feature cannot be placed and share one extra
+    community.
+    """
+    num_nodes = features.shape[0]
+    profiled = np.diff(features.indptr) > 0
+    labels = np.zeros(num_nodes, dtype=np.int64)
+    n_clusters = min(n_clusters, int(np.count_nonzero(profiled)))
+    if n_clusters > 1:
+        model = MiniBatchKMeans(
+            n_clusters=n_clusters,
+            batch_size=BATCH_SIZE,
+            n_init=3,
+            random_state=seed,
+        )
+        labels[profiled] = model.fit_predict(features[profiled])
+    labels[~profiled] = labels.max(initial=0) + 1
+    return np.unique(labels, return_inverse=True)[1]
+
+
+class PortProfileAlgorithm(CommunityDetectionBase):
+    """
+    Groups hosts by the ports they use rather than by whom they talk to.
+
+    Builds a sparse TF-IDF node x port matrix from the port tokens kept at
+    ingest and clusters it with mini-batch k-means, so memory stays bounded by
+    the number of port tokens and the cluster centers.
+
+    Attributes:
+        n_clusters (int): Number of port profiles to find.
+    """
+
+    # Dominated by the port tokens, about a hundred per host on the Large dataset.
+    cost_model = CostModel(
+        seconds_per_node=1e-4,
+        seconds_per_edge=0,
+        bytes_per_node=4000,
+        bytes_per_edge=0,
+    )
+
+    def __init__(
+        self,
+        seed: Optional[int] = DEFAULT_SEED,
+        n_clusters: int = DEFAULT_N_CLUSTERS,
+    ):
+        super().__init__(seed=seed)
+        self.n_clusters = n_clusters
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return {**super().params, "n_clusters": self.n_clusters}
+
+    def estimate_cost(self, num_nodes: int, num_edges: int) -> CostEstimate:
+        return linear_cost(
+            self.cost_model, num_nodes, num_edges, csr_bytes(num_nodes, num_edges)
+        )
+
+    def detect_communities(self, G: nx.Graph) -> Dict[str, int]:
+        return self.detect_csr(CSRGraph.from_networkx(G))
+
+    def detect_csr(self, csr: CSRGraph) -> Dict[str, int]:
+        features = port_features(csr.port_table, csr.port_offsets, csr.port_ids)
+        self.stats["num_ports"] = features.shape[1]
+        labels = cluster_port_profiles(features, self.n_clusters, self.seed)
+        return dict(zip(csr.node_labels(), labels.tolist()))
+
+    def run(
+        self, file_size: FileSize, reduction: GraphReduction = NO_REDUCTION
+    ) -> Dict[str, int]:
+        return self.run_csr(file_size, reduction)
@@ -0,0 +1,248 @@
+import threading
+from collections import OrderedDict
+from typing import Any
+from typing import Dict
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from fastapi import Query
+from scipy.sparse.csgraph import connected_components
+
+from backend.tools.custom_enums import EdgeSampling
+from backend.tools.custom_enums import FileSize
+from backend.tools.graph_cache import csr_cache
+from backend.tools.graph_snapshot import CSRGraph
+from backend.tools.instrumentation import add_response_headers
+from backend.tools.instrumentation import stage
+from backend.tools.result_store import dataset_fingerprint
+from backend.tools.result_store import result_store
+
+REDUCED_CACHE_SIZE = 4
+DEFAULT_SAMPLE_SEED = 42
+
+ReductionStats = Dict[str, int]
+ReducedGraph = Tuple[CSRGraph, ReductionStats]
+
+
+class GraphReduction(NamedTuple):
+    """
+    Filters applied to a graph between parsing and detection.
+
+    They run in field order: hub removal, edge sampling, k-core, then the
+    largest connected component, so the result of an active
+    ``largest_component`` is always connected.
+
+    Attributes:
+        max_degree (Optional[int]): Drop nodes with a higher degree, such as
+            scanners touching thousands of hosts.
+        edge_sample (Optional[float]): Fraction of the edges to keep.
+        sampling (EdgeSampling): Draw edges uniformly or proportionally to
+            their weight.
+        sample_seed (int): Seed of the edge sample.
+        k_core (Optional[int]): Keep the k-core, nodes with at least ``k_core``
+            neighbours among the kept nodes.
+        largest_component (bool): Keep only the largest connected component.
+    """
+
+    max_degree: Optional[int] = None
+    edge_sample: Optional[float] = None
+    sampling: EdgeSampling = EdgeSampling.UNIFORM
+    sample_seed: int = DEFAULT_SAMPLE_SEED
+    k_core: Optional[int] = None
+    largest_component: bool = False
+
+    @property
+    def active(self) -> bool:
+        return (
+            self.max_degree is not None
+            or (self.edge_sample is not None and self.edge_sample < 1)
+            or self.k_core is not None
+            or self.largest_component
+        )
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        """
+        Parameters that change the reduced graph, used to key cached results.
+        """
+        params: Dict[str, Any] = {
+            "max_degree": self.max_degree,
+            "k_core": self.k_core,
+            "largest_component": self.largest_component,
+        }
+        if self.edge_sample is not None and self.edge_sample < 1:
+            params.update(
+                edge_sample=self.edge_sample,
+                sampling=self.sampling.value,
+                sample_seed=self.sample_seed,
+            )
+        return params
+
+
+NO_REDUCTION = GraphReduction()
+
+
+def reduction_query(
+    max_degree: Optional[int] = Query(None, ge=1),
+    edge_sample: Optional[float] = Query(None, gt=0, le=1),
+    sampling: EdgeSampling = EdgeSampling.UNIFORM,
+    sample_seed: int = DEFAULT_SAMPLE_SEED,
+    k_core: Optional[int] = Query(None, ge=1),
+    largest_component: bool = False,
+) -> GraphReduction:
+    """
+    Read the reduction options of a request.
+    """
+    return GraphReduction(
+        max_degree=max_degree,
+        edge_sample=edge_sample,
+        sampling=sampling,
+        sample_seed=sample_seed,
+        k_core=k_core,
+        largest_component=largest_component,
+    )
+
+
+def _degrees(num_nodes: int, u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """
+    Count distinct neighbours per node; self-loops do not count.
+    """
+    links = u != v
+    return np.bincount(u[links], minlength=num_nodes) + np.bincount(
+        v[links], minlength=num_nodes
+    )
+
+
+def _sample_edges(
+    w: np.ndarray, candidates: np.ndarray, reduction: GraphReduction
+) -> np.ndarray:
+    """
+    Pick ``edge_sample`` of the candidate edges without replacement.
+
+    Weighted sampling uses Efraimidis-Spirakis keys ``log(U) / w``: the edges
+    with the largest keys form a weight-proportional sample in one pass.
+    """
+    rng = np.random.default_rng(reduction.sample_seed)
+    keys = rng.random(len(candidates))
+    if reduction.sampling == EdgeSampling.WEIGHTED:
+        keys = np.log(keys) / np.maximum(w[candidates], 1)
+    size = int(round(reduction.edge_sample * len(candidates)))
+    if size >= len(candidates):
+        return candidates
+    return candidates[np.argpartition(-keys, size)[:size]]
+
+
+def _k_core(
+    keep: np.ndarray, u: np.ndarray, v: np.ndarray, edges: np.ndarray, k: int
+) -> np.ndarray:
+    """
+    Peel nodes with fewer than ``k`` neighbours until none are left.
+    """
+    keep = keep.copy()
+    while True:
+        alive = edges & keep[u] & keep[v]
+        low = keep & (_degrees(len(keep), u[alive], v[alive]) < k)
+        if not low.any():
+            return keep
+        keep &= ~low
+
+
+def _largest_component(
+    keep: np.ndarray, u: np.ndarray, v: np.ndarray, edges: np.ndarray
+) -> np.ndarray:
+    n = len(keep)
+    alive = edges & keep[u] & keep[v]
+    graph = sp.csr_matrix(
+        (np.ones(np.count_nonzero(alive)), (u[alive], v[alive])), shape=(n, n)
+    )
+    _, labels = connected_components(graph, directed=False)
+    sizes = np.bincount(labels[keep], minlength=labels.max() + 1)
+    return keep & (labels == np.argmax(sizes))
+
+
+def reduce_graph(csr: CSRGraph, reduction: GraphReduction) -> ReducedGraph:
+    """
+    Apply a reduction to a CSR graph with whole-array operations.
+
+    Returns the reduced graph with the number of nodes and edges kept and
+    removed.
+    """
+    n = csr.num_nodes
+    u, v, w = csr.edge_arrays()
+    keep = np.ones(n, dtype=bool)
+    edges = np.ones(len(u), dtype=bool)
+
+    if reduction.max_degree is not None:
+        keep &= _degrees(n, u, v) <= reduction.max_degree
+    if reduction.edge_sample is not None and reduction.edge_sample < 1:
+        candidates = np.flatnonzero(keep[u] & keep[v])
+        edges[:] = False
+        edges[_sample_edges(w, candidates, reduction)] = True
+    if reduction.k_core is not None:
+        keep = _k_core(keep, u, v, edges, reduction.k_core)
+    if reduction.largest_component:
+        keep = _largest_component(keep, u, v, edges)
+
+    reduced = csr.subgraph(keep, u[edges], v[edges], w[edges])
+    num_edges = int(np.count_nonzero(edges & keep[u] & keep[v]))
+    stats = {
+        "nodes": reduced.num_nodes,
+        "edges": num_edges,
+        "removed_nodes": n - reduced.num_nodes,
+        "removed_edges": len(u) - num_edges,
+    }
+    return reduced, stats
+
+
+class _ReducedGraphCache:
+    """
+    Small LRU of reduced graphs keyed by dataset content and reduction.
+    """
+
+    def __init__(self, max_entries: int = REDUCED_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, ReducedGraph]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, file_size: FileSize, reduction: GraphReduction) -> ReducedGraph:
+        key = (dataset_fingerprint(file_size), tuple(sorted(reduction.params.items())))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        csr = csr_cache.get(file_size)
+        with stage("reduce") as info:
+            entry = reduce_graph(csr, reduction)
+            info.update(entry[1])
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+
+reduced_graphs = _ReducedGraphCache()
+
+
+def reduction_stats(file_size: FileSize, reduction: GraphReduction) -> ReductionStats:
+    """
+    Return how many nodes and edges a reduction keeps and removes, and report
+    the counts as ``X-Reduction-*`` response headers.
+
+    Counts are kept in the result store, so requests served from cached
+    partitions report them without reducing the graph again.
+    """
+    stats = result_store.get_or_compute(
+        result_store.make_key("reduction", file_size, reduction.params),
+        lambda: reduced_graphs.get(file_size, reduction)[1],
+    )
+    add_response_headers(
+        {
+            f"X-Reduction-{name.replace('_', '-').title()}": str(value)
+            for name, value in stats.items()
+        }
+    )
+    return stats
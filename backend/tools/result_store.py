@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Optional
+
+from backend.tools.custom_enums import FileSize
+from backend.tools.path_selecter import dataset_stat
+from backend.tools.path_selecter import path_selecter
+
+DEFAULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR", ".cache/results")
+DEFAULT_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", 512 * 1024**2))
+
+
+def dataset_fingerprint(file_size: FileSize) -> str:
+    """
+    Identify the current content of a dataset by its resolved path, file count,
+    total size and latest mtime.
+    """
+    path = os.path.realpath(path_selecter(file_size=file_size))
+    num_files, size, mtime_ns = dataset_stat(path)
+    raw = f"{path}:{num_files}:{size}:{mtime_ns}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class ResultStore:
+    """
+    Size-bounded on-disk store of JSON results shared by all workers.
+
+    Each entry is one file written atomically, so concurrent workers never see
+    a partial result. Reads refresh the file's mtime and eviction removes the
+    least recently used entries once the directory exceeds its budget.
+
+    Attributes:
+        directory (str): Directory holding the entries.
+        max_bytes (int): Budget for the total size of all entries.
+        hits (int): Number of lookups served from disk.
+        misses (int): Number of lookups that had to compute the result.
+    """
+
+    def __init__(
+        self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.directory: str = directory
+        self.max_bytes: int = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(algorithm: str, file_size: FileSize, params: Dict[str, Any]) -> str:
+        """
+        Build the key of a result from the algorithm, dataset and parameters.
+        """
+        raw = json.dumps(
+            {
+                "algorithm": algorithm,
+                "dataset": dataset_fingerprint(file_size),
+                "params": params,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def contains(self, key: str) -> bool:
+        """
+        Tell whether a result is stored, without reading it.
+        """
+        return os.path.exists(self._path(key))
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f, separators=(",", ":"))
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._evict()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _entries(self):
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        entries = []
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        return entries
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            total -= size
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "current_bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+
+result_store = ResultStore()
@@ -0,0 +1,99 @@
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+
+import numpy as np
+
+from backend.tools.graph_snapshot import CSR_ARRAYS
+from backend.tools.graph_snapshot import CSRGraph
+
+
+class SharedArray(NamedTuple):
+    """
+    Location of one array in shared memory.
+
+    Attributes:
+        name (str): Name of the shared memory block.
+        dtype (str): NumPy dtype string of the array.
+        shape (tuple): Shape of the array.
+    """
+
+    name: str
+    dtype: str
+    shape: tuple
+
+
+SharedHandle = Dict[str, SharedArray]
+
+
+class SharedCSRGraph:
+    """
+    Publishes the arrays of a CSR graph in shared memory blocks.
+
+    The picklable ``handle`` lets worker processes map the same pages with
+    ``attach_csr`` instead of receiving a pickled copy of the graph. The blocks
+    live until ``close`` is called, so use it as a context manager.
+
+    Attributes:
+        handle (SharedHandle): Block name, dtype and shape of every array.
+    """
+
+    def __init__(self, csr: CSRGraph):
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.handle: SharedHandle = {}
+        try:
+            for name in CSR_ARRAYS:
+                array = np.ascontiguousarray(getattr(csr, name))
+                # Zero-sized blocks are not allowed.
+                block = shared_memory.SharedMemory(
+                    create=True, size=max(array.nbytes, 1)
+                )
+                self._blocks.append(block)
+                np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+                self.handle[name] = SharedArray(
+                    block.name, array.dtype.str, array.shape
+                )
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self) -> "SharedCSRGraph":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+@contextmanager
+def attach_csr(handle: SharedHandle) -> Iterator[CSRGraph]:
+    """
+    Map a published CSR graph into this process without copying it.
+
+    The arrays are only valid inside the ``with`` block and callers must not
+    keep references to them once it exits.
+    """
+    blocks = {
+        name: shared_memory.SharedMemory(name=spec.name)
+        for name, spec in handle.items()
+    }
+    try:
+        arrays = {
+            name: np.ndarray(spec.shape, np.dtype(spec.dtype), buffer=blocks[name].buf)
+            for name, spec in handle.items()
+        }
+        csr = CSRGraph(**arrays)
+        del arrays
+        yield csr
+    finally:
+        csr = None
+        for block in blocks.values():
+            block.close()
@@ -0,0 +1,183 @@
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import eigsh
+from sklearn.cluster import KMeans
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.cluster import SpectralClustering
+
+from backend.tools.admission import CostEstimate
+from backend.tools.admission import CostModel
+from backend.tools.community_base import CommunityDetectionBase
+from backend.tools.community_base import DEFAULT_N_CLUSTERS
+from backend.tools.community_base import DEFAULT_SEED
+
+# Below this size the dense eigen-solver is cheaper and more robust than ARPACK.
+DENSE_SOLVER_MAX_NODES = 200
+MINI_BATCH_MIN_NODES = 50_000
+# Dense mode holds a few n x n float matrices and solves them in O(n^3).
+DENSE_MATRIX_COPIES = 3
+DENSE_SECONDS_PER_FLOP = 1e-10
+
+
+def spectral_embedding(
+    adjacency: sp.csr_matrix, n_components: int, seed: Optional[int] = None
+) -> np.ndarray:
+    """
+    Embed nodes with the top eigenvectors of the normalized adjacency matrix.
+
+    These are the eigenvectors of the smallest eigenvalues of the normalized
+    Laplacian, computed with an iterative solver on the sparse matrix.
+    """
+    n = adjacency.shape[0]
+    degrees = np.asarray(adjacency.sum(axis=1)).ravel()
+    inv_sqrt = np.zeros(n)
+    nonzero = degrees > 0
+    inv_sqrt[nonzero] = 1.0 / np.sqrt(degrees[nonzero])
+    scaling = sp.diags(inv_sqrt)
+    normalized = (scaling @ adjacency @ scaling).tocsr()
+
+    if n <= DENSE_SOLVER_MAX_NODES or n_components >= n - 1:
+        _, vectors = np.linalg.eigh(normalized.toarray())
+        vectors = vectors[:, -n_components:]
+    else:
+        v0 = np.random.default_rng(seed).uniform(size=n)
+        _, vectors = eigsh(normalized, k=n_components, which="LA", v0=v0, tol=1e-6)
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _cluster_embedding(
+    embedding: np.ndarray, n_clusters: int, seed: Optional[int]
+) -> np.ndarray:
+    if n_clusters <= 1:
+        return np.zeros(len(embedding), dtype=np.int64)
+    if len(embedding) >= MINI_BATCH_MIN_NODES:
+        model = MiniBatchKMeans(n_clusters=n_clusters, random_state=seed, n_init=3)
+    else:
+        model = KMeans(n_clusters=n_clusters, random_state=seed, n_init=4)
+    return model.fit_predict(embedding)
+
+
+def sparse_spectral_clustering(
+    adjacency: sp.csr_matrix,
+    n_clusters: int,
+    seed: Optional[int] = None,
+    per_component: bool = False,
+) -> np.ndarray:
+    """
+    Cluster a graph from its sparse adjacency matrix.
+
+    With ``per_component`` each connected component is embedded on its own and
+    receives a share of the clusters proportional to its size; components too
+    small for a share keep a single label.
+    """
+    n = adjacency.shape[0]
+    n_clusters = max(1, min(n_clusters, n))
+    if not per_component:
+        embedding = spectral_embedding(adjacency, n_clusters, seed)
+        return _cluster_embedding(embedding, n_clusters, seed)
+
+    _, components = connected_components(adjacency, directed=False)
+    sizes = np.bincount(components)
+    shares = np.clip(np.rint(n_clusters * sizes / n).astype(np.int64), 1, sizes)
+    first_label = np.concatenate([[0], np.cumsum(shares)[:-1]])
+    labels = first_label[components]
+    order = np.argsort(components, kind="stable")
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+    for component in np.flatnonzero(shares > 1):
+        members = order[bounds[component] : bounds[component + 1]]
+        sub = adjacency[members][:, members]
+        embedding = spectral_embedding(sub, shares[component], seed)
+        labels[members] += _cluster_embedding(embedding, shares[component], seed)
+    # Compact labels so they are contiguous even if a cluster ended up empty.
+    return np.unique(labels, return_inverse=True)[1]
+
+
+class SpectralClusteringAlgorithm(CommunityDetectionBase):
+    # Sparse mode, per cluster: one sparse product per Lanczos iteration.
+    cost_model = CostModel(
+        seconds_per_node=1e-6,
+        seconds_per_edge=1e-6,
+        bytes_per_node=200,
+        bytes_per_edge=300,
+    )
+    max_concurrent = 2
+
+    def __init__(
+        self,
+        seed: Optional[int] = DEFAULT_SEED,
+        n_clusters: int = DEFAULT_N_CLUSTERS,
+        per_component: bool = False,
+        sparse: bool = True,
+    ):
+        super().__init__(seed=seed)
+        self.n_clusters = n_clusters
+        self.per_component = per_component
+        self.sparse = sparse
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return {
+            **super().params,
+            "n_clusters": self.n_clusters,
+            "per_component": self.per_component,
+            "sparse": self.sparse,
+        }
+
+    def estimate_cost(self, num_nodes: int, num_edges: int) -> CostEstimate:
+        """
+        Scale the sparse estimate with the number of eigenvectors, or model the
+        dense matrices and solver.
+        """
+        estimate = super().estimate_cost(num_nodes, num_edges)
+        if not self.sparse:
+            return estimate._replace(
+                seconds=DENSE_SECONDS_PER_FLOP * float(num_nodes) ** 3,
+                peak_bytes=estimate.peak_bytes
+                + DENSE_MATRIX_COPIES * 8 * num_nodes**2,
+            )
+        # ARPACK keeps max(2k + 1, 20) Lanczos vectors per node.
+        basis = max(2 * self.n_clusters + 1, 20)
+        return CostEstimate(
+            seconds=estimate.seconds * self.n_clusters,
+            peak_bytes=estimate.peak_bytes + 8 * basis * num_nodes,
+        )
+
+    def detect_communities(self, G: nx.Graph) -> Dict[str, int]:
+        """
+        Detect communities using spectral clustering.
+
+        The sparse mode works on a scipy sparse adjacency with an iterative
+        eigen-solver, so memory grows with the number of edges rather than the
+        square of the number of nodes.
+        """
+        if self.sparse:
+            adjacency = nx.to_scipy_sparse_array(
+                G, weight="weight", dtype=float, format="csr"
+            )
+            labels = sparse_spectral_clustering(
+                adjacency,
+                n_clusters=self.n_clusters,
+                seed=self.seed,
+                per_component=self.per_component,
+            )
+        else:
+            adjacency_matrix = nx.to_numpy_array(G)
+            labels = (
+                SpectralClustering(
+                    n_clusters=min(self.n_clusters, len(G.nodes)),
+                    affinity="precomputed",
+                    random_state=self.seed,
+                )
+                .fit(adjacency_matrix)
+                .labels_
+            )
+        return {str(node): int(label) for node, label in zip(G.nodes(), labels)}
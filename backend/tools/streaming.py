@@ -0,0 +1,135 @@
+import base64
+import binascii
+import json
+from itertools import islice
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from fastapi import HTTPException
+from fastapi import status
+from fastapi.responses import Response
+from fastapi.responses import StreamingResponse
+
+from backend.tools.custom_enums import OutputFormat
+from backend.tools.instrumentation import stage
+
+STREAM_BATCH_SIZE = 10_000
+DEFAULT_PAGE_SIZE = 10_000
+MAX_PAGE_SIZE = 100_000
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# One shared C-accelerated encoder; batches are encoded as whole containers
+# and spliced together instead of serializing item by item.
+_encode = json.JSONEncoder(
+    separators=(",", ":"), ensure_ascii=False, default=sorted
+).encode
+
+
+def _batches(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_json_object(
+    pairs: Iterable[Tuple[Any, Any]], batch_size: int = STREAM_BATCH_SIZE
+) -> Iterator[bytes]:
+    """
+    Serialize key/value pairs as one JSON object, a batch at a time.
+    """
+    yield b"{"
+    first = True
+    for batch in _batches(pairs, batch_size):
+        body = _encode({str(key): value for key, value in batch})[1:-1]
+        yield (body if first else "," + body).encode("utf-8")
+        first = False
+    yield b"}"
+
+
+def iter_json_array(
+    values: Iterable[Any], batch_size: int = STREAM_BATCH_SIZE
+) -> Iterator[bytes]:
+    """
+    Serialize values as one JSON array, a batch at a time.
+    """
+    yield b"["
+    first = True
+    for batch in _batches(values, batch_size):
+        body = _encode(batch)[1:-1]
+        yield (body if first else "," + body).encode("utf-8")
+        first = False
+    yield b"]"
+
+
+def iter_ndjson(
+    records: Iterable[Dict[str, Any]], batch_size: int = STREAM_BATCH_SIZE
+) -> Iterator[bytes]:
+    """
+    Serialize records as newline-delimited JSON, a batch at a time.
+    """
+    for batch in _batches(records, batch_size):
+        yield ("\n".join(_encode(record) for record in batch) + "\n").encode("utf-8")
+
+
+def json_response(content: Any) -> Response:
+    """
+    Serialize a plain JSON payload directly, bypassing FastAPI's generic encoder.
+    """
+    with stage("serialize") as info:
+        body = _encode(content).encode("utf-8")
+        info["bytes"] = len(body)
+    return Response(content=body, media_type="application/json")
+
+
+def streaming_response(
+    chunks: Iterable[bytes], output_format: OutputFormat
+) -> StreamingResponse:
+    media_type = (
+        NDJSON_MEDIA_TYPE
+        if output_format == OutputFormat.NDJSON
+        else "application/json"
+    )
+    return StreamingResponse(chunks, media_type=media_type)
+
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(str(offset).encode("ascii")).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    try:
+        offset = int(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("ascii"))
+    except (ValueError, binascii.Error, UnicodeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor: {cursor}",
+        ) from exc
+    if offset < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor: {cursor}",
+        )
+    return offset
+
+
+def paginate(
+    total: int, cursor: Optional[str], limit: int
+) -> Tuple[int, int, Optional[str]]:
+    """
+    Return the bounds of the page starting at the cursor and the next page's cursor.
+    """
+    start = min(decode_cursor(cursor), total)
+    end = min(start + min(limit, MAX_PAGE_SIZE), total)
+    next_cursor = encode_cursor(end) if end < total else None
+    return start, end, next_cursor
@@ -0,0 +1,205 @@
+import gzip
+import os
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+import networkx as nx
+import numpy as np
+
+from backend.tools.graph_utils import READ_BLOCK_SIZE
+
+# Bounds on the work of one request: windows built and buckets per window.
+MAX_WINDOWS = int(os.environ.get("WINDOW_MAX_COUNT", 1000))
+MAX_SPAN = int(os.environ.get("WINDOW_MAX_SPAN", 1000))
+
+
+class TimeWindow:
+    """
+    Weighted edges of the flows whose timestamp falls in ``[start, end)``.
+
+    Attributes:
+        start (float): Inclusive start of the window.
+        end (float): Exclusive end of the window.
+        u (np.ndarray): First endpoint of each unique undirected pair.
+        v (np.ndarray): Second endpoint of each unique undirected pair.
+        weights (np.ndarray): Number of flows observed for each pair.
+        num_lines (int): Number of edge lines in the window.
+    """
+
+    def __init__(
+        self,
+        nodes: List[str],
+        start: float,
+        end: float,
+        u: np.ndarray,
+        v: np.ndarray,
+        weights: np.ndarray,
+        num_lines: int,
+    ):
+        self._nodes = nodes
+        self.start = start
+        self.end = end
+        self.u = u
+        self.v = v
+        self.weights = weights
+        self.num_lines = num_lines
+
+    def to_networkx(self) -> nx.Graph:
+        """
+        Build the weighted graph of the nodes active in this window.
+        """
+        nodes = self._nodes
+        G = nx.Graph()
+        G.add_weighted_edges_from(
+            (nodes[a], nodes[b], w)
+            for a, b, w in zip(self.u.tolist(), self.v.tolist(), self.weights.tolist())
+        )
+        return G
+
+
+class WindowedEdges:
+    """
+    Per-window edge lists built from one pass over a time-stamped edge file.
+
+    Flows are counted per ``step``-wide bucket of their timestamp; a window is
+    the union of ``window / step`` consecutive buckets, so ``step == window``
+    gives tumbling windows and a smaller step gives sliding ones. Node IDs are
+    interned once for all windows.
+
+    Attributes:
+        nodes (List[str]): Interned node IDs, indexed by node.
+        window (float): Width of each window, in timestamp units.
+        step (float): Distance between the starts of consecutive windows.
+        windows (List[TimeWindow]): Non-empty windows in time order.
+    """
+
+    def __init__(
+        self, nodes: List[str], window: float, step: float, windows: List[TimeWindow]
+    ):
+        self.nodes = nodes
+        self.window = window
+        self.step = step
+        self.windows = windows
+
+
+def read_windowed_edges(
+    edges_files: Sequence[str], window: float, step: Optional[float] = None
+) -> WindowedEdges:
+    """
+    Read edge files once and split their flows into tumbling or sliding windows.
+
+    ``window`` must be a whole multiple of ``step`` (which defaults to ``window``),
+    at most ``MAX_SPAN`` steps wide, and the flows may cover at most
+    ``MAX_WINDOWS`` windows. Reading stops as soon as they cover more.
+    """
+    step = window if step is None else step
+    if window <= 0 or step <= 0:
+        raise ValueError("window and step must be positive.")
+    span = window / step
+    if span > MAX_SPAN:
+        raise ValueError(f"window may be at most {MAX_SPAN} steps wide.")
+    if abs(span - round(span)) > 1e-9:
+        raise ValueError("window must be a whole multiple of step.")
+    span = int(round(span))
+    bounds: List[int] = []
+
+    def check_bounds(bucket: int) -> None:
+        if not bounds:
+            bounds.extend((bucket, bucket))
+            return
+        bounds[0], bounds[1] = min(bounds[0], bucket), max(bounds[1], bucket)
+        num_windows = max(bounds[0], bounds[1] - span + 1) - bounds[0] + 1
+        if num_windows > MAX_WINDOWS:
+            raise ValueError(
+                f"The flows span more than {MAX_WINDOWS} windows; use a larger step."
+            )
+
+    index: Dict[bytes, int] = {}
+    bucket_of: Dict[bytes, int] = {}
+    buckets: Dict[int, Dict[int, int]] = {}
+    bucket_lines: Counter = Counter()
+
+    def consume(lines: List[bytes]) -> None:
+        # Flows repeat within a timestamp, so identical (timestamp, src, dst)
+        # triples are counted first and interned once.
+        triples = Counter(
+            tuple(line.split(None, 3)[:3])
+            for line in lines
+            if line[:1] not in (b"#", b"")
+        )
+        for parts, count in triples.items():
+            if len(parts) < 3:
+                continue
+            timestamp = parts[0]
+            bucket = bucket_of.get(timestamp)
+            if bucket is None:
+                try:
+                    bucket = int(float(timestamp) // step)
+                except ValueError:
+                    continue
+                bucket_of[timestamp] = bucket
+                check_bounds(bucket)
+            u = index.setdefault(parts[1], len(index))
+            v = index.setdefault(parts[2], len(index))
+            key = (u << 32) | v if u <= v else (v << 32) | u
+            pairs = buckets.setdefault(bucket, {})
+            pairs[key] = pairs.get(key, 0) + count
+            bucket_lines[bucket] += count
+
+    for edges_file in edges_files:
+        with gzip.open(edges_file, mode="rb") as fopen:
+            remainder = b""
+            while True:
+                block = fopen.read(READ_BLOCK_SIZE)
+                if not block:
+                    break
+                lines = (remainder + block).split(b"\n")
+                remainder = lines.pop()
+                consume(lines)
+            consume([remainder])
+
+    nodes = [node.decode("utf-8") for node in index]
+    arrays = {
+        bucket: (
+            np.fromiter(pairs.keys(), dtype=np.int64, count=len(pairs)),
+            np.fromiter(pairs.values(), dtype=np.int64, count=len(pairs)),
+        )
+        for bucket, pairs in buckets.items()
+    }
+
+    # Only buckets holding flows are visited: a window start is skipped ahead
+    # to the next one that covers a bucket.
+    keys = sorted(arrays)
+    windows: List[TimeWindow] = []
+    if keys:
+        first, last = keys[0], keys[-1]
+        start, final = first, max(first, last - span + 1)
+        while start <= final:
+            lo, hi = bisect_left(keys, start), bisect_left(keys, start + span)
+            if lo == hi:
+                start = keys[lo] - span + 1
+                continue
+            members = [arrays[b] for b in keys[lo:hi]]
+            pair_keys, inverse = np.unique(
+                np.concatenate([pairs for pairs, _ in members]), return_inverse=True
+            )
+            weights = np.bincount(
+                inverse, weights=np.concatenate([counts for _, counts in members])
+            ).astype(np.int64)
+            windows.append(
+                TimeWindow(
+                    nodes,
+                    start=start * step,
+                    end=start * step + window,
+                    u=pair_keys >> 32,
+                    v=pair_keys & 0xFFFFFFFF,
+                    weights=weights,
+                    num_lines=sum(bucket_lines[b] for b in keys[lo:hi]),
+                )
+            )
+            start += 1
+    return WindowedEdges(nodes, window=window, step=step, windows=windows)
@@ -0,0 +1,155 @@
+import argparse
+import gzip
+import os
+from typing import List
+from typing import Optional
+
+import numpy as np
+
+from backend.tools.custom_enums import FileSize
+from backend.tools.path_selecter import path_selecter
+
+PROTOCOLS = np.array([6, 17])
+SERVICE_PORTS = np.array([22, 53, 80, 123, 443, 8080])
+MAX_PORTS_PER_FLOW = 3
+WRITE_CHUNK_LINES = 100_000
+
+
+def plant_communities(
+    num_nodes: int, num_communities: int, rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Assign every node to one of ``num_communities`` communities of random size.
+    """
+    weights = rng.dirichlet(np.full(num_communities, 5.0))
+    return rng.choice(num_communities, size=num_nodes, p=weights)
+
+
+def generate_edges(
+    path: str,
+    communities: np.ndarray,
+    num_edges: int,
+    mixing: float = 0.1,
+    duration: int = 172_800,
+    seed: Optional[int] = None,
+) -> None:
+    """
+    Write a gzipped flow log in the Cisco ``timestamp node1 node2 ports...`` format.
+
+    Each flow starts at a uniformly drawn node; with probability ``1 - mixing``
+    its peer is drawn from the same planted community, otherwise from the whole
+    graph. Timestamps rise evenly over ``duration`` and each flow carries one to
+    ``MAX_PORTS_PER_FLOW`` port tokens such as ``6p443-2``.
+    """
+    rng = np.random.default_rng(seed)
+    num_nodes = len(communities)
+    order = np.argsort(communities, kind="stable")
+    sizes = np.bincount(communities, minlength=communities.max() + 1)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for first in range(0, num_edges, WRITE_CHUNK_LINES):
+            count = min(WRITE_CHUNK_LINES, num_edges - first)
+            src = rng.integers(num_nodes, size=count)
+            community = communities[src]
+            local = order[
+                starts[community]
+                + (rng.random(count) * sizes[community]).astype(np.int64)
+            ]
+            dst = np.where(
+                rng.random(count) < mixing, rng.integers(num_nodes, size=count), local
+            )
+            dst = np.where(dst == src, (dst + 1) % num_nodes, dst)
+            timestamps = (np.arange(first, first + count) * duration) // num_edges
+            num_ports = rng.integers(1, MAX_PORTS_PER_FLOW + 1, size=count)
+            protocols = rng.choice(PROTOCOLS, size=(count, MAX_PORTS_PER_FLOW))
+            # Each community favours one service so ports carry a weak signal.
+            services = np.where(
+                rng.random((count, MAX_PORTS_PER_FLOW)) < 0.5,
+                SERVICE_PORTS[community % len(SERVICE_PORTS)][:, None],
+                rng.choice(SERVICE_PORTS, size=(count, MAX_PORTS_PER_FLOW)),
+            )
+            buckets = rng.integers(1, 6, size=(count, MAX_PORTS_PER_FLOW))
+            lines = []
+            for i in range(count):
+                ports = " ".join(
+                    f"{protocols[i, j]}p{services[i, j]}-{buckets[i, j]}"
+                    for j in range(num_ports[i])
+                )
+                lines.append(f"{timestamps[i]} {src[i]} {dst[i]} {ports}\n")
+            f.write("".join(lines))
+
+
+def generate_ground_truth(path: str, communities: np.ndarray) -> List[int]:
+    """
+    Write planted communities in the ``grouping.gt.txt`` format, one
+    comma-separated group of node IDs per line. Returns the group sizes.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    sizes = []
+    with open(path, "w", encoding="utf-8") as f:
+        for community in np.unique(communities):
+            members = np.flatnonzero(communities == community)
+            f.write(",".join(str(node) for node in members.tolist()) + "\n")
+            sizes.append(len(members))
+    return sizes
+
+
+def generate_dataset(
+    root: str,
+    num_nodes: int,
+    num_edges: int,
+    num_communities: int,
+    mixing: float = 0.1,
+    seed: Optional[int] = None,
+    file_size: FileSize = FileSize.SMALL_2D,
+) -> str:
+    """
+    Generate an edge file and its ground truth under ``root``.
+
+    Files are laid out at the paths ``path_selecter`` expects for ``file_size``
+    and ``FileSize.TEST``, so the application reads them unchanged when run
+    from ``root``. Returns the path of the edge file.
+    """
+    rng = np.random.default_rng(seed)
+    communities = plant_communities(num_nodes, num_communities, rng)
+    edges_file = os.path.join(root, path_selecter(file_size=file_size))
+    generate_edges(edges_file, communities, num_edges, mixing=mixing, seed=seed)
+    generate_ground_truth(
+        os.path.join(root, path_selecter(file_size=FileSize.TEST)), communities
+    )
+    return edges_file
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic Cisco-format dataset with ground truth."
+    )
+    parser.add_argument("root", help="Directory to write the dataset into.")
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--edges", type=int, default=40_000)
+    parser.add_argument("--communities", type=int, default=20)
+    parser.add_argument("--mixing", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--file-size",
+        type=FileSize,
+        default=FileSize.SMALL_2D,
+        help="Dataset slot to write the edge file to.",
+    )
+    args = parser.parse_args()
+    edges_file = generate_dataset(
+        args.root,
+        num_nodes=args.nodes,
+        num_edges=args.edges,
+        num_communities=args.communities,
+        mixing=args.mixing,
+        seed=args.seed,
+        file_size=args.file_size,
+    )
+    print(edges_file)
+
+
+if __name__ == "__main__":
+    main()
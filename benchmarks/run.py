@@ -0,0 +1,261 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from backend.services.gt_services import GroundTruth
+from backend.tools.community_base import CommunityDetectionFactory
+from backend.tools.custom_enums import CommunityAlgorithm
+from backend.tools.custom_enums import FileSize
+from backend.tools.graph_utils import create_html_visualization
+from backend.tools.graph_utils import read_weighted_edges_to_graph
+from backend.tools.path_selecter import path_selecter
+from benchmarks.generate import generate_dataset
+
+RESULTS_VERSION = 1
+DEFAULT_TOLERANCE = 0.25
+# Timings below this are dominated by noise and never flagged.
+MIN_COMPARED_SECONDS = 0.05
+METRICS = ("seconds", "peak_bytes")
+
+
+def measure(
+    func: Callable[[], Any], repeat: int = 1, memory: bool = True
+) -> Tuple[Dict[str, Any], Any]:
+    """
+    Time a callable and trace its peak Python heap usage.
+
+    Timings take the best of ``repeat`` untraced runs; peak memory comes from
+    one extra run under tracemalloc so tracing does not skew the timings.
+    """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    entry: Dict[str, Any] = {
+        "seconds": min(timings),
+        "median_seconds": statistics.median(timings),
+    }
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            entry["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return entry, result
+
+
+def run_benchmarks(
+    root: str,
+    algorithms: List[CommunityAlgorithm],
+    repeat: int = 1,
+    memory: bool = True,
+    seed: Optional[int] = 42,
+    time_budget: float = 10.0,
+    viz: bool = True,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Benchmark parsing, ground-truth loading, every detector and the HTML
+    visualization on the dataset generated under ``root``.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        edges_file = os.path.join(root, path_selecter(file_size=FileSize.SMALL_2D))
+        results["parse"], G = measure(
+            lambda: read_weighted_edges_to_graph(edges_file), repeat, memory
+        )
+        results["parse"].update(nodes=G.number_of_nodes(), edges=G.number_of_edges())
+        results["ground_truth"], _ = measure(
+            lambda: GroundTruth(file_size=FileSize.TEST), repeat, memory
+        )
+
+        partition = None
+        for algorithm in algorithms:
+            detector = CommunityDetectionFactory.get_community_detector(
+                algorithm, seed=seed, time_budget=time_budget
+            )
+            name = f"detect[{algorithm.value}]"
+            try:
+                results[name], detected = measure(
+                    lambda: detector.detect_communities(G), repeat, memory
+                )
+            except Exception as exc:  # pylint: disable=broad-except
+                results[name] = {"error": f"{type(exc).__name__}: {exc}"}
+                continue
+            if partition is None or algorithm == CommunityAlgorithm.LOUVAIN:
+                partition = detected
+
+        if viz and partition is not None:
+            results["viz"], _ = measure(
+                lambda: create_html_visualization(G, partition), repeat, memory
+            )
+    finally:
+        os.chdir(cwd)
+    return results
+
+
+def compare(
+    current: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[Dict[str, Any]]:
+    """
+    Compare results with a baseline and list every metric that regressed by
+    more than ``tolerance`` (a fraction of the baseline value).
+    """
+    regressions = []
+    for name, base in baseline.items():
+        entry = current.get(name)
+        if entry is None:
+            continue
+        for metric in METRICS:
+            old, new = base.get(metric), entry.get(metric)
+            if not old or new is None:
+                continue
+            if metric == "seconds" and max(old, new) < MIN_COMPARED_SECONDS:
+                continue
+            ratio = new / old
+            if ratio > 1 + tolerance:
+                regressions.append(
+                    {
+                        "benchmark": name,
+                        "metric": metric,
+                        "baseline": old,
+                        "current": new,
+                        "ratio": ratio,
+                    }
+                )
+    return regressions
+
+
+def _format_table(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> str:
+    lines = [f"{'benchmark':40} {'seconds':>10} {'peak MiB':>10} {'vs base':>8}"]
+    for name, entry in results.items():
+        if "error" in entry:
+            lines.append(f"{name:40} {entry['error']}")
+            continue
+        peak = entry.get("peak_bytes")
+        peak_text = f"{peak / 1024**2:10.1f}" if peak is not None else f"{'-':>10}"
+        ratio = ""
+        base = (baseline or {}).get(name, {}).get("seconds")
+        if base:
+            ratio = f"{entry['seconds'] / base:7.2f}x"
+        lines.append(f"{name:40} {entry['seconds']:10.3f} {peak_text} {ratio:>8}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark parsing, detection, visualization and ground truth "
+        "loading on a synthetic Cisco-format dataset."
+    )
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--edges", type=int, default=40_000)
+    parser.add_argument("--communities", type=int, default=20)
+    parser.add_argument("--mixing", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--algorithms",
+        nargs="*",
+        type=CommunityAlgorithm,
+        default=list(CommunityAlgorithm),
+        help="Detectors to benchmark (defaults to all).",
+    )
+    parser.add_argument("--time-budget", type=float, default=10.0)
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--no-viz", action="store_true")
+    parser.add_argument(
+        "--workdir", help="Directory for the generated dataset (temporary if unset)."
+    )
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--baseline", help="Results file to compare against.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    config = {
+        "nodes": args.nodes,
+        "edges": args.edges,
+        "communities": args.communities,
+        "mixing": args.mixing,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "time_budget": args.time_budget,
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.abspath(args.workdir or tmp)
+        generate_dataset(
+            root,
+            num_nodes=args.nodes,
+            num_edges=args.edges,
+            num_communities=args.communities,
+            mixing=args.mixing,
+            seed=args.seed,
+        )
+        results = run_benchmarks(
+            root,
+            algorithms=args.algorithms,
+            repeat=args.repeat,
+            memory=not args.no_memory,
+            seed=args.seed,
+            time_budget=args.time_budget,
+            viz=not args.no_viz,
+        )
+
+    document = {
+        "version": RESULTS_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": config,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline_document = json.load(f)
+        if baseline_document.get("config") != config:
+            print("warning: baseline was recorded with a different configuration")
+        baseline = baseline_document["results"]
+    print(_format_table(results, baseline))
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression['benchmark']} {regression['metric']}: "
+                f"{regression['baseline']:.4g} -> {regression['current']:.4g} "
+                f"({regression['ratio']:.2f}x)"
+            )
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,21 @@
+import os
+import time
+
 from fastapi import FastAPI
 from fastapi import Request
 from fastapi.responses import HTMLResponse
 from fastapi.responses import JSONResponse
+from mangum import Mangum
 from starlette.templating import Jinja2Templates
-from magnum import Mangum
 
 from backend.routes.community_routes import community_router
+from backend.routes.evaluation_routes import evaluation_router
 from backend.routes.gt_routes import gt_router
+from backend.routes.job_routes import job_router
+from backend.routes.metrics_routes import metrics_router
+from backend.tools.community_base import warm_up
+from backend.tools.instrumentation import REQUEST_SECONDS
+from backend.tools.instrumentation import start_timings
 
 app = FastAPI(
     title="Cisco Analysis - API",
@@ -17,8 +26,44 @@ app = FastAPI(
 
 templates = Jinja2Templates(directory="templates")
 
+# Set ENABLE_PROFILING=1 to let requests ask for a cProfile run with ?profile=1.
+# Off by default: profiling slows the request down several times over.
+PROFILING_ENABLED = os.environ.get("ENABLE_PROFILING", "").lower() in ("1", "true")
+
+# Set WARM_UP=1 to pay the detector imports during the Lambda init phase
+# instead of on the first request that needs them.
+if os.environ.get("WARM_UP", "").lower() in ("1", "true"):
+    warm_up()
+
 app.include_router(router=gt_router)
 app.include_router(router=community_router)
+app.include_router(router=job_router)
+app.include_router(router=evaluation_router)
+app.include_router(router=metrics_router)
+
+
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    requested = request.query_params.get("profile", "").lower() in ("1", "true")
+    timings = start_timings(profile=PROFILING_ENABLED and requested)
+    start = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - start
+
+    route = request.scope.get("route")
+    if timings.stages:
+        REQUEST_SECONDS.observe(
+            elapsed, route=getattr(route, "path", "unmatched"), **timings.labels
+        )
+    server_timing = timings.server_timing()
+    total = f"total;dur={elapsed * 1000:.2f}"
+    response.headers["Server-Timing"] = (
+        f"{server_timing}, {total}" if server_timing else total
+    )
+    response.headers.update(timings.headers)
+    if timings.profile_id is not None:
+        response.headers["X-Profile-Id"] = timings.profile_id
+    return response
 
 
 @app.get("/", response_class=HTMLResponse, tags=["Base"])
@@ -31,4 +76,4 @@ async def health_check():
     return {"status": "healthy"}
 
 
-handler = Mangum(app)
\ No newline at end of file
+handler = Mangum(app)
@@ -0,0 +1,15 @@
+import networkx as nx
+
+from backend.tools.girvan_newman import BoundedGirvanNewman
+
+
+def test_short_budget_leaves_time_for_splits():
+    # 800 nodes and about 9k edges: a full betweenness sample here takes a
+    # large part of a 3 second budget.
+    G = nx.Graph(nx.random_partition_graph([100] * 8, 0.2, 0.004, seed=1))
+
+    girvan_newman = BoundedGirvanNewman(time_budget=3.0, workers=1, seed=1)
+    girvan_newman.fit(G)
+
+    assert girvan_newman.levels > 0
+    assert girvan_newman.stop_reason == "time budget exhausted"
@@ -0,0 +1,34 @@
+import gzip
+
+from backend.tools.graph_utils import read_weighted_edges
+
+
+def write_edges(path, content: bytes) -> str:
+    with gzip.open(path, mode="wb") as f:
+        f.write(content)
+    return str(path)
+
+
+def test_read_weighted_edges_skips_blank_lines(tmp_path):
+    edges_file = write_edges(
+        tmp_path / "edges.txt.gz",
+        b"# header\n"
+        b"1 a b 6p80-1\n"
+        b"\n"
+        b"   \t \n"
+        b"\r\n"
+        b"2 a b 6p80-1\r\n"
+        b"3 b c\n"
+        b"4 lonely\n",
+    )
+
+    aggregate = read_weighted_edges(edges_file)
+
+    assert aggregate.nodes == ["a", "b", "c"]
+    assert aggregate.num_lines == 3
+    edges = {
+        (aggregate.nodes[u], aggregate.nodes[v]): w
+        for u, v, w in zip(aggregate.u, aggregate.v, aggregate.weights)
+    }
+    assert edges == {("a", "b"): 2, ("b", "c"): 1}
+    assert aggregate.ports[0] == {"6p80-1"}